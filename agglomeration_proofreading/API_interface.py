@@ -1,10 +1,37 @@
+from functools import lru_cache
+
 from agglomeration_proofreading.ap_utils import int_to_list
 from brainmaps_api_fcn.basic_requests import EmptyResponse
 
 
+# module-level lru_cache helpers so the cache lives outside the GraphTools
+# instance. The version argument allows invalidating stale entries without
+# dropping the whole cache object (see GraphTools.clear_cache)
+@lru_cache(maxsize=4096)
+def _cached_map(api_fcn, sv_id, version):
+    return api_fcn.get_map(sv_id)[0]
+
+
+@lru_cache(maxsize=4096)
+def _cached_groups(api_fcn, sv_id, version):
+    return api_fcn.get_groups(sv_id)
+
+
+@lru_cache(maxsize=4096)
+def _cached_equivalence_list(api_fcn, sv_id, version):
+    try:
+        edges = api_fcn.get_equivalence_list(sv_id)
+    except EmptyResponse:
+        edges = int_to_list(sv_id)
+    return edges
+
+
 class GraphTools:
     """retrieves agglomeration information necessary to build the neuron graph
-    via BrainMaps API"""
+    via BrainMaps API
+
+    Responses for single segment ids are cached so that repeated selection of
+    segments of the same neuron does not pay a network round-trip each time."""
 
     def __init__(self, api_fcn):
         """initiates class, creates API access
@@ -14,6 +41,12 @@ class GraphTools:
                                                             BrainMapsRequest
         """
         self.API_fcn = api_fcn
+        self._cache_version = 0
+
+    def clear_cache(self):
+        """invalidates cached API responses by bumping the version that is
+        part of the cache key"""
+        self._cache_version += 1
 
     def get_agglo_id(self, sv_id):
         """retrieves the id of the agglomerated segment to which sv_id belongs
@@ -23,7 +56,7 @@ class GraphTools:
 
         Returns:
             int: segment id in the agglomerated volume"""
-        return self.API_fcn.get_map(sv_id)[0]
+        return _cached_map(self.API_fcn, sv_id, self._cache_version)
 
     def get_members(self, sv_id):
         """retrieves all members of the agglomerated segment to which sv_id
@@ -38,6 +71,8 @@ class GraphTools:
 
 
         """
+        if isinstance(sv_id, int):
+            return _cached_groups(self.API_fcn, sv_id, self._cache_version)
         return self.API_fcn.get_groups(sv_id)
 
     def get_edges(self, ids):
@@ -48,6 +83,9 @@ class GraphTools:
 
         Returns:
             edges (list) : list of edges"""
+        if isinstance(ids, int):
+            return _cached_equivalence_list(self.API_fcn, ids,
+                                            self._cache_version)
         try:
             edges = self.API_fcn.get_equivalence_list(ids)
         # if ids is an isolated segment, the edge response is empty, downstream
@@ -69,4 +107,4 @@ class GraphTools:
             """
         members = self.get_members(sv_id)
         edges = {sv: self.get_edges(members[sv]) for sv in int_to_list(sv_id)}
-        return edges
\ No newline at end of file
+        return edges
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def flat_list(list2d):
     """flatten nested list"""
     return [x for sublist in list2d for x in sublist]
@@ -14,7 +17,7 @@ def return_other(_list, item):
 def int_to_list(sv_id):
     """helper function to turn int input to list for request body creation
     in many BrainMapsAPI calls"""
-    if type(sv_id) == int:
+    if isinstance(sv_id, (int, np.integer)):
         return [sv_id]
     else:
         return sv_id
@@ -32,6 +35,187 @@ def convert_coord(coord, orig, targ=[9, 9, 25]):
     return [newx, newy, newz]
 
 
+class BranchPoints:
+    """Structure-of-arrays store for branch point locations
+
+    Coordinates are kept in a preallocated (N,3) int32 array that grows by
+    amortized doubling, the visited state in a parallel boolean array. This
+    replaces the list of [[x,y,z], bool] pairs so that finding the last
+    unvisited branch point is a single C-level scan instead of a Python loop
+    over pair-boxed objects.
+
+    Iteration and item access yield [[x,y,z], visited] pairs to stay
+    compatible with the saved data format. The saving-related attributes
+    mirror those of CustomList (see there).
+
+    Attributes:
+        _coords (numpy.ndarray) : (N,3) int32 array of branch point coordinates
+        _visited (numpy.ndarray) : boolean array of the visited state
+        _len (int) : number of branch points stored
+        unsaved_changes (Boolean) : see CustomList
+        structure_changed (Boolean) : see CustomList
+        last_saved_offset (int) : see CustomList
+    """
+
+    __slots__ = ('_coords', '_visited', '_len', 'unsaved_changes',
+                 'structure_changed', 'last_saved_offset', 'on_change')
+
+    _CHUNK = 64
+
+    def __init__(self, on_change=None):
+        self._coords = np.empty((self._CHUNK, 3), dtype=np.int32)
+        self._visited = np.zeros(self._CHUNK, dtype=bool)
+        self._len = 0
+        self.unsaved_changes = False
+        self.structure_changed = False
+        self.last_saved_offset = 0
+        self.on_change = on_change
+
+    def _mark_unsaved(self):
+        """sets the unsaved changes flag and notifies the change listener"""
+        self.unsaved_changes = True
+        if self.on_change is not None:
+            self.on_change()
+
+    def __contains__(self, coord):
+        return bool(
+            (self._coords[:self._len] == coord).all(axis=1).any())
+
+    def __getitem__(self, idx):
+        return [self.coord(idx), bool(self._visited[idx])]
+
+    def __iadd__(self, other):
+        for item in other:
+            self.append(item)
+        return self
+
+    def __iter__(self):
+        return (self[idx] for idx in range(self._len))
+
+    def __len__(self):
+        return self._len
+
+    def _grow(self):
+        """doubles the preallocated arrays when they are full"""
+        if self._len == len(self._coords):
+            self._coords = np.append(self._coords,
+                                     np.empty_like(self._coords), axis=0)
+            self._visited = np.append(self._visited,
+                                      np.zeros(len(self._visited),
+                                               dtype=bool))
+
+    def append(self, item):
+        coord, visited = item
+        self._grow()
+        self._coords[self._len] = coord
+        self._visited[self._len] = visited
+        self._len += 1
+        self._mark_unsaved()
+
+    def coord(self, idx):
+        """returns the coordinates of the branch point at idx as plain ints"""
+        return [int(x) for x in self._coords[idx]]
+
+    def last_unvisited(self):
+        """returns the index of the last branch point that has not been
+        flagged as visited or None if there is none"""
+        unvisited = np.flatnonzero(~self._visited[:self._len])
+        if len(unvisited):
+            return int(unvisited[-1])
+        return None
+
+    def mark_visited(self, idx):
+        # in-place modification that cannot be expressed as an append-only
+        # delta, hence flag structure_changed
+        self._visited[idx] = True
+        self._mark_unsaved()
+        self.structure_changed = True
+
+
+class IntArrayList:
+    """Typed array-backed list of fixed-width integer rows
+
+    Backs high-volume revision data stores (edge pairs, merger coordinates)
+    with a contiguous numpy array grown by amortized doubling instead of
+    nested Python lists, cutting the per-item memory by an order of
+    magnitude. Mimics the parts of the CustomList interface used by the
+    proofreader; iteration and item access yield plain int lists so the
+    saved data format is unchanged.
+
+    Attributes:
+        _rows (numpy.ndarray) : (N, width) array holding the data
+        _len (int) : number of rows stored
+        unsaved_changes (Boolean) : see CustomList
+        structure_changed (Boolean) : see CustomList
+        last_saved_offset (int) : see CustomList
+    """
+
+    __slots__ = ('_rows', '_len', 'unsaved_changes', 'structure_changed',
+                 'last_saved_offset', 'on_change')
+
+    _CHUNK = 64
+
+    def __init__(self, width, dtype=np.int64, on_change=None):
+        self._rows = np.empty((self._CHUNK, width), dtype=dtype)
+        self._len = 0
+        self.unsaved_changes = False
+        self.structure_changed = False
+        self.last_saved_offset = 0
+        self.on_change = on_change
+
+    def _mark_unsaved(self):
+        """sets the unsaved changes flag and notifies the change listener"""
+        self.unsaved_changes = True
+        if self.on_change is not None:
+            self.on_change()
+
+    def __getitem__(self, idx):
+        return [int(x) for x in self._rows[:self._len][idx]]
+
+    def __iadd__(self, other):
+        for row in other:
+            self.append(row)
+        return self
+
+    def __isub__(self, other):
+        to_remove = {tuple(row) for row in other}
+        keep = [row for row in self if tuple(row) not in to_remove]
+        self._len = len(keep)
+        if keep:
+            self._rows[:self._len] = keep
+        self._mark_unsaved()
+        self.structure_changed = True
+        return self
+
+    def __iter__(self):
+        return (self[idx] for idx in range(self._len))
+
+    def __len__(self):
+        return self._len
+
+    def _grow(self):
+        """doubles the preallocated array when it is full"""
+        if self._len == len(self._rows):
+            self._rows = np.append(self._rows, np.empty_like(self._rows),
+                                   axis=0)
+
+    def append(self, row):
+        self._grow()
+        self._rows[self._len] = row
+        self._len += 1
+        self._mark_unsaved()
+
+    def pop(self, index=-1):
+        if index in (-1, self._len - 1):
+            self._len -= 1
+        else:
+            index = index % self._len
+            self._rows[index:self._len - 1] = self._rows[index + 1:self._len]
+            self._len -= 1
+        self._mark_unsaved()
+        self.structure_changed = True
+
+
 class CustomList:
     """List object with a flag that indicates unsaved changes
 
@@ -48,20 +232,42 @@ class CustomList:
         self.max_length (int) : variable that restricts list to a certain length
                                 earlier entries are discarded if max_length is
                                 exceeded
+        last_saved_offset (int) : length of _data at the last save, items beyond
+                                  this offset can be appended to a delta log
+                                  instead of rewriting the full list
+        structure_changed (Boolean) : flag that indicates modifications other
+                                      than appending (removal, in-place
+                                      replacement). Such changes cannot be
+                                      expressed as an append-only delta and
+                                      require a full snapshot
     """
-    def __init__(self, data=None, max_length=None):
+
+    __slots__ = ('_data', 'unsaved_changes', 'max_length', 'last_saved_offset',
+                 'structure_changed', 'on_change')
+
+    def __init__(self, data=None, max_length=None, on_change=None):
         if data is None:
             self._data = []
         else:
             self._data = data
         self.unsaved_changes = False
         self.max_length = max_length
+        self.last_saved_offset = 0
+        self.structure_changed = False
+        self.on_change = on_change
+
+    def _mark_unsaved(self):
+        """sets the unsaved changes flag and notifies the change listener"""
+        self.unsaved_changes = True
+        if self.on_change is not None:
+            self.on_change()
 
     def __add__(self, other):
         self.__iadd__(other)
 
     def __delitem__(self, key):
-        self.unsaved_changes = True
+        self._mark_unsaved()
+        self.structure_changed = True
         self._data.pop(key)
 
     def __getitem__(self, key):
@@ -69,13 +275,15 @@ class CustomList:
 
     def __iadd__(self, other):
         self._data += other
-        self.unsaved_changes = True
+        self._mark_unsaved()
         self.check_length()
-        return CustomList(self._data)
+        return self
 
     def __isub__(self, other):
         self._data = [item for item in self if item not in other]
-        return CustomList(self._data)
+        self._mark_unsaved()
+        self.structure_changed = True
+        return self
 
     def __iter__(self):
         return iter(self._data)
@@ -91,7 +299,8 @@ class CustomList:
 
     def __setitem__(self, key, value):
         self._data[key] = value
-        self.unsaved_changes = True
+        self._mark_unsaved()
+        self.structure_changed = True
 
     def __str__(self):
         return '{},  unsaved changes: {}'.format(self._data, self.unsaved_changes)
@@ -101,27 +310,31 @@ class CustomList:
 
     def append(self, item):
         self._data.append(item)
-        self.unsaved_changes = True
+        self._mark_unsaved()
         self.check_length()
 
     def check_length(self):
         """removes entries from the beginning if maximal length is exceeded"""
-        if self.max_length:
+        if self.max_length and len(self._data) > self.max_length:
             self._data = self._data[-self.max_length:]
+            self.structure_changed = True
 
     def extend(self, other):
         self.__iadd__(other)
 
     def pop(self, index=-1):
         self._data.pop(index)
-        self.unsaved_changes = True
+        self._mark_unsaved()
+        self.structure_changed = True
 
     def remove(self, item):
         self._data.remove(item)
-        self.unsaved_changes = True
+        self._mark_unsaved()
+        self.structure_changed = True
 
     def update(self, data):
         """replaces data in the list"""
         self._data = data
-        self.unsaved_changes = True
+        self._mark_unsaved()
+        self.structure_changed = True
         self.check_length()
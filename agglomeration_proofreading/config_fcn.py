@@ -91,4 +91,9 @@ def determine_args(ap_args):
     elif args.remove_token.lower() in ('no', 'false', 'f', 'n', '0'):
         args.remove_token = False
 
+    # full layer source paths, assembled once here so the entry points do not
+    # repeat the data_src concatenation
+    args.base_path = args.data_src + args.base_volume
+    args.raw_path = args.data_src + args.raw_data
+
     return args
@@ -15,6 +15,8 @@ def connected_components(graph):
             keys : component index
             values: list with node members of the component
     """
+    if not graph:
+        return {}
     visited = {sv: False for sv in graph.keys()}
     cc = {}
     idx = 0
@@ -43,6 +45,25 @@ def connected_components(graph):
     return cc
 
 
+def clone_graph(graph):
+    """Fast clone of a graph dict
+
+    Equivalent to copy.deepcopy for a dict of int keys mapping to lists of
+    ints, but without the per-object memo bookkeeping deepcopy performs:
+    the keys and values are plain ints that need no copying, only the dict
+    and the partner lists are duplicated.
+
+    Args:
+        graph (dict):
+            keys : graph nodes
+            values: list of connected partners
+
+    Returns:
+        dict : independent copy of graph
+    """
+    return {node: partners[:] for node, partners in graph.items()}
+
+
 def isolate_set(sv_ids, edges):
     """ Returns all edges of sv_ids with exception to those among members of
     sv_ids.
@@ -57,15 +78,13 @@ def isolate_set(sv_ids, edges):
                                 isolated
         edges (list) : list of all edges of the segment(s) in sv_ids
 
-    Returns:
-        edges_to_split (list) : edges to split to isolate sv_ids from other
-        segments.
+    Yields:
+        edge (list) : edge to split to isolate sv_ids from other segments
     """
-    edges_to_split = []
+    sv_ids = set(int_to_list(sv_ids))
     for edge in edges:
         if edge[0] not in sv_ids or edge[1] not in sv_ids:
-            edges_to_split.append(edge)
-    return edges_to_split
+            yield edge
 
 
 class LocalGraph:
@@ -82,49 +101,136 @@ class LocalGraph:
         cc (dict) : connected components representation of the graph
             keys : component index
             values: list with member nodes of the component
+        node_to_cc (dict) : inverse index mapping each node to the index of
+                            its connected component in cc
+        dirty (bool) : flag that indicates modifications of the graph since it
+                       was last saved. Reset by the saving routine
         """
 
     def __init__(self):
         """Initiates attributes as empty dictionaries."""
         self.graph = dict()
-        self.cc = dict()
+        self._cc = dict()
+        self._node_to_cc = dict()
+        self._cc_dirty = False
+        self.dirty = False
+
+    def __deepcopy__(self, memo):
+        """Specialized clone that bypasses the generic deepcopy machinery
+
+        Everything below the partner lists and component members is a plain
+        int, so a flat two-level copy gives an equivalent result without
+        deepcopy's per-element dispatch and memo bookkeeping.
+        """
+        new = LocalGraph()
+        new.graph = clone_graph(self.graph)
+        new._cc = {idx: list(members) for idx, members in self._cc.items()}
+        new._node_to_cc = dict(self._node_to_cc)
+        new._cc_dirty = self._cc_dirty
+        new.dirty = self.dirty
+        memo[id(self)] = new
+        return new
+
+    @property
+    def cc(self):
+        """connected components of the graph, recomputed lazily so that a
+        burst of invalidating mutations (e.g. repeated undo) pays for a
+        single recomputation at the next read"""
+        if self._cc_dirty:
+            self.update_cc()
+        return self._cc
+
+    @property
+    def node_to_cc(self):
+        """inverse index mapping each node to the index of its connected
+        component, kept consistent with cc"""
+        if self._cc_dirty:
+            self.update_cc()
+        return self._node_to_cc
 
     def add_node(self, node):
         """Adds node(s) to graph and updates connected components.
 
         Args:
             node (int or list) : node or list of node to add as key to the graph dict
+
+        Returns:
+            added (list) : the nodes that were not yet part of the graph and
+                           have actually been added
         """
+        added = []
         for idx_ in int_to_list(node):
             if not self.check_in_graph(idx_):
                 self.graph[idx_] = []
                 self._add_to_cc([idx_])
+                self.dirty = True
+                added.append(idx_)
+        return added
 
     def del_node(self, node):
-        """Deletes node(s) from graph and updates connected component attribute.
+        """Deletes node(s) from graph and updates the connected components the
+        node(s) belonged to.
 
         Args:
             node (int or list) : node or list of node to delete from the graph
                                 dict
+
+        Returns:
+            removed (dict) : mapping of each removed node to its former partner
+                             list, sufficient to restore the nodes and their
+                             edges (see restore_nodes)
         """
-        for idx_ in int_to_list(node):
-            self.graph.pop(idx_, None)
-            for sv_id, partner in self.graph.items():
-                if idx_ in partner:
-                    self.graph[sv_id].remove(idx_)
-        self.update_cc()
+        # capture the adjacency before any removal strips edges between the
+        # nodes that are deleted together
+        removed = {idx_: list(self.graph[idx_])
+                   for idx_ in int_to_list(node) if idx_ in self.graph}
+        if not removed:
+            return removed
+        affected = {self.node_to_cc[idx_] for idx_ in removed
+                    if idx_ in self.node_to_cc}
+        for idx_, partners in removed.items():
+            del self.graph[idx_]
+            # edges are stored symmetrically, so only the partner lists of
+            # the former neighbours need cleaning instead of scanning the
+            # whole graph
+            for partner in partners:
+                if partner in self.graph and idx_ in self.graph[partner]:
+                    self.graph[partner].remove(idx_)
+        self.dirty = True
+        self._update_cc_for(affected)
+        return removed
+
+    def restore_nodes(self, adjacency):
+        """Re-adds nodes and their edges from a removed-adjacency record.
+
+        Args:
+            adjacency (dict) : mapping of node to its former partner list as
+                               returned by del_node
+        """
+        for node, partners in adjacency.items():
+            self.add_node(node)
+            for partner in partners:
+                self.add_single_edge([node, partner])
 
     def add_edge(self, edge):
         """Checks edge input and prompts addition to the graph
 
         Args:
             edge (list) : list with single edge  or list of edges
+
+        Returns:
+            added_nodes (list) : nodes newly added to the graph
+            added_edges (list) : edges newly added to the graph
         """
+        added_nodes, added_edges = [], []
         if any(isinstance(item, list) for item in edge):
             for edge_ in edge:
-                self.add_single_edge(edge_)
+                nodes, edges = self.add_single_edge(edge_)
+                added_nodes += nodes
+                added_edges += edges
         else:
-            self.add_single_edge(edge)
+            added_nodes, added_edges = self.add_single_edge(edge)
+        return added_nodes, added_edges
 
     def add_single_edge(self, edge):
         """Adds single edges to the graph and updates the connected component
@@ -132,14 +238,25 @@ class LocalGraph:
 
         Args:
             edge (list) : list with edge members
+
+        Returns:
+            added_nodes (list) : nodes newly added to the graph
+            added_edges (list) : the edge as single-entry list if it was not
+                                 yet part of the graph, else an empty list
         """
+        added_nodes = []
+        is_new = edge[0] not in self.graph \
+            or edge[1] not in self.graph[edge[0]]
         for node in edge:
-            if node not in self.graph.keys():
-                self.add_node(node)
+            if node not in self.graph:
+                added_nodes += self.add_node(node)
             partner = return_other(edge, node)
             if partner not in self.graph[node]:
                 self.graph[node].append(partner)
+                self.dirty = True
         self._add_to_cc(edge)
+        added_edges = [list(edge)] if is_new else []
+        return added_nodes, added_edges
 
     def check_in_graph(self, nodes):
         """checks whether nodes are in the graph
@@ -149,7 +266,7 @@ class LocalGraph:
         Returns:
             bool : True if all nodes are members in the graph
         """
-        return all([node in self.graph.keys() for node in int_to_list(nodes)])
+        return all(node in self.graph for node in int_to_list(nodes))
 
     def del_edge(self, edge):
         """Deletes edges from the graph and updates the connected component
@@ -157,17 +274,29 @@ class LocalGraph:
 
         Args:
             edge (list) : list with single edge or list of edges
+
+        Returns:
+            removed (list) : the edges that have actually been removed
         """
+        removed = []
         if any(isinstance(item, list) for item in edge):
             for edge_ in edge:
-                self.del_single_edge(edge_)
+                removed += self.del_single_edge(edge_)
         else:
-            self.del_single_edge(edge)
-        self.update_cc()
+            removed += self.del_single_edge(edge)
+        # defer the component recomputation to the next read of cc
+        self._cc_dirty = True
+        return removed
 
     def del_single_edge(self, edge):
-        """Deletes a single edge from the graph"""
+        """Deletes a single edge from the graph
+
+        Returns:
+            removed (list) : the edge as single-entry list if both nodes were
+                             part of the graph, else an empty list
+        """
         if self.check_in_graph(edge):
+            self.dirty = True
             for node in edge:
                 try: # hacky way to ensure proofreading continues however, this
                     # is a sign that there is a bug if the partner of an edge
@@ -176,8 +305,10 @@ class LocalGraph:
                 except ValueError:
                     print('ATTENTION:', return_other(edge, node),
                           'was not found in list of partners of node', node)
+            return [list(edge)]
         else:
             print('not all nodes of', edge, 'are in the graph')
+            return []
 
     def _add_to_cc(self, edge):
         """Updates connected component by adding edge
@@ -188,35 +319,113 @@ class LocalGraph:
         Args:
             edge (list) : list with "edge", can be a single segment id
         """
-        _map = {}
-        for node in edge:
-            _map.update({
-                node: idx
-                for idx, members in self.cc.items() if node in members
-            })
+        _map = {node: self.node_to_cc[node] for node in edge
+                if node in self.node_to_cc}
 
         if not _map:
-            if self.cc.keys():
+            if self.cc:
                 idx = max(list(self.cc.keys())) + 1
             else:
                 idx = 0
             self.cc[idx] = edge.copy()
+            for node in edge:
+                self.node_to_cc[node] = idx
 
         elif len(_map) == 1:
-            self.cc[list(_map.values())[0]].append(return_other(edge, *_map))
+            idx = list(_map.values())[0]
+            other = return_other(edge, *_map)
+            self.cc[idx].append(other)
+            self.node_to_cc[other] = idx
 
         elif len(_map) == 2 and _map[edge[0]] != _map[edge[1]]:
             combined_comp = self.cc[_map[edge[0]]] + self.cc[_map[edge[1]]]
             self.cc[_map[edge[0]]] = combined_comp
             self.cc.pop(_map[edge[1]])
-            self.cc = {
+            self._cc = {
                 i: members
-                for i, members in enumerate(self.cc.values())
+                for i, members in enumerate(self._cc.values())
             }
+            self._update_node_to_cc()
+
+    def _update_node_to_cc(self):
+        """rebuilds the inverse node to connected component index"""
+        self._node_to_cc = {
+            node: idx
+            for idx, members in self._cc.items() for node in members
+        }
+
+    def export_state(self):
+        """Returns the graph dict together with its component caches
+
+        The tuple can be handed back to import_state for an O(1) swap
+        between alternative graph representations without recomputing the
+        connected components.
+
+        Returns:
+            tuple : (graph, cc, node_to_cc)
+        """
+        if self._cc_dirty:
+            self.update_cc()
+        return self.graph, self._cc, self._node_to_cc
+
+    def import_state(self, state):
+        """Adopts a state tuple from export_state
+
+        Args:
+            state (tuple) : (graph, cc, node_to_cc). cc and node_to_cc may
+                            be None, the components are then recomputed
+                            lazily at the next read
+        """
+        self.graph, cc, node_to_cc = state
+        if cc is None:
+            self._cc = dict()
+            self._node_to_cc = dict()
+            self._cc_dirty = True
+        else:
+            self._cc = cc
+            self._node_to_cc = node_to_cc
+            self._cc_dirty = False
 
     def update_cc(self):
         """calculates connected component analysis for the graph"""
-        self.cc = connected_components(self.graph)
+        self._cc_dirty = False
+        self._cc = connected_components(self.graph)
+        self._update_node_to_cc()
+
+    def _update_cc_for(self, cc_ids):
+        """Recomputes connected components restricted to the given component
+        ids.
+
+        Deleting nodes can only split the components they belonged to, so
+        only the surviving members of the affected components are retraversed
+        instead of rerunning the component analysis on the whole graph.
+
+        Args:
+            cc_ids (set) : indices of the components whose membership changed
+        """
+        pending = set()
+        for idx in cc_ids:
+            for node in self.cc.pop(idx, []):
+                self.node_to_cc.pop(node, None)
+                if node in self.graph:
+                    pending.add(node)
+        while pending:
+            start = pending.pop()
+            component = [start]
+            seen = {start}
+            queue = [start]
+            while queue:
+                node = queue.pop()
+                for partner in self.graph[node]:
+                    if partner not in seen:
+                        seen.add(partner)
+                        component.append(partner)
+                        queue.append(partner)
+            pending -= seen
+            idx = max(self.cc, default=-1) + 1
+            self.cc[idx] = component
+            for node in component:
+                self.node_to_cc[node] = idx
 
     def return_edge_list(self, node):
         """Returns a list of edges for nodes in node
@@ -231,7 +440,7 @@ class LocalGraph:
         """
         edges = []
         for sv_id in int_to_list(node):
-            if sv_id in self.graph.keys():
+            if sv_id in self.graph:
                 edges += [[sv_id, partner_id] for partner_id in
                           self.graph[sv_id]]
         return edges
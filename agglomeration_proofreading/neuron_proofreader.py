@@ -1,16 +1,41 @@
 import json
 import neuroglancer
 import os
+import queue
 
 import numpy as np
 
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
-from threading import Lock, Thread
+from itertools import chain
+from threading import Lock
 
 from agglomeration_proofreading.viewer_bases import _ViewerBase2Col
-from agglomeration_proofreading.neuron_graph import isolate_set, LocalGraph
-from agglomeration_proofreading.ap_utils import CustomList, flat_list
+from agglomeration_proofreading.neuron_graph import (clone_graph, isolate_set,
+                                                     LocalGraph)
+from agglomeration_proofreading.ap_utils import (BranchPoints, CustomList,
+                                                 IntArrayList)
+
+
+# resolved once at import instead of per viewer construction
+_KEYBINDINGS_PROOFREADER = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'KEYBINDINGS_proofreader.ini')
+
+
+def _json_dumps(data):
+    """serializes data to a JSON string, with orjson at C speed if it is
+    installed and the stdlib otherwise"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data)
 
 
 class NeuronProofreading(_ViewerBase2Col):
@@ -170,12 +195,46 @@ class NeuronProofreading(_ViewerBase2Col):
         self.graph = LocalGraph()
         self.graph_tools = graph_tool
         self.var_names = [
-            'edges_to_set', 'edges_to_delete', 'action_history',
-            'branch_point', 'segmentation_merger_loc'
+            'edges_to_set', 'edges_to_delete', 'branch_point',
+            'segmentation_merger_loc'
         ]
+        # ring buffer of the last 10 graph-modifying actions, stored as
+        # minimal diff records instead of full graph copies (see
+        # _undo_last_action). Only lives for the duration of a session
+        self.action_history = deque(maxlen=10)
+        # epoch counters that let the autosave detect unsaved changes with a
+        # single integer comparison instead of polling every list
+        self._dirty_epoch = 0
+        self._last_saved_epoch = 0
         for name in self.var_names:
-            setattr(self, name, CustomList([]))
+            setattr(self, name, self._new_store(name))
         self.lock = Lock()
+        # bounded worker pool for BrainMaps fetches; segment ids queued by
+        # rapid keypresses are coalesced into one batched request
+        self._fetch_pool = ThreadPoolExecutor(max_workers=8)
+        self._pending_svs = queue.Queue()
+        # cache of the annotation centers in annotation list order, used for
+        # the vectorized nearest-annotation lookup
+        self._anno_centers = np.empty((0, 3), dtype=np.float32)
+        # hashes of the connected components already pushed to the viewer so
+        # _upd_viewer only sends components that actually changed
+        self._pushed_cc_hashes = set()
+        # nesting depth of _batched_viewer guards; while > 0, _upd_viewer
+        # calls only record what is pending instead of pushing state
+        self._viewer_update_depth = 0
+        self._viewer_update_pending = False
+        self._viewer_clear_pending = False
+        # first ids of the locally deleted edges, kept for the O(1) overlap
+        # test in _handle_select
+        self._deleted_src_ids = set()
+        # id pairs of the stored edges to set, kept for the O(1) duplicate
+        # test in _direct_merging
+        self._set_edge_keys = set()
+        # bookkeeping for incremental saving: between full snapshots only the
+        # items appended since the last save are written to a delta log
+        self._save_count = 0
+        self._snapshot_interval = 10
+        self._delta_fn = None
         self.base_layer = 'base'
         self.aggl_layer = 'agglo'
         layers = {self.aggl_layer: base_vol, self.base_layer: base_vol}
@@ -186,7 +245,6 @@ class NeuronProofreading(_ViewerBase2Col):
         if data is not None:
             self._load_data(data)
             last_position = data['last_position']
-        self.action_history.max_length = 10
 
         super(NeuronProofreading, self).__init__(raw_data=raw_data,
                                                  layers=layers,
@@ -211,6 +269,13 @@ class NeuronProofreading(_ViewerBase2Col):
         self._auto_save()
         self.exit_event.set()
 
+    def _clean_exit(self):
+        """"""
+        # wait for queued background fetches before the viewer is reset and
+        # parked so no straggler task writes into the recycled viewer
+        self._fetch_pool.shutdown(wait=True)
+        super()._clean_exit()
+
     # VIEWER SETUP
     def _set_keybindings(self):
         """Binds keyboard events to call back functions"""
@@ -258,23 +323,19 @@ class NeuronProofreading(_ViewerBase2Col):
         self.viewer.actions.add('toggle_hover_values',
                                 lambda s: self.toggle_hover_value_display())
 
-        _DEFAULT_DIR = os.path.dirname(os.path.abspath(__file__))
-        fn = 'KEYBINDINGS_proofreader.ini'
-        config_file = os.path.join(_DEFAULT_DIR, fn)
-        if not os.path.exists(config_file):
+        if not os.path.exists(_KEYBINDINGS_PROOFREADER):
             raise FileNotFoundError
-        self._bind_pairs(config_file)
+        self._bind_pairs(_KEYBINDINGS_PROOFREADER)
 
     def _annotation_layer_cb(self):
         """Triggers column layout setting and loads annotation from previous
-        revisions"""
+        revisions in a single batched transaction"""
         super()._annotation_layer_cb()
-        annocount = 0
-        if any(self.branch_point):
-            for point in self.branch_point:
-                if point[1]:
-                    annocount += 1
-                    self.annotation.make_ellipsoid('', point[0])
+        coords = [point[0] for point in self.branch_point if point[1]]
+        if coords:
+            self.annotation.make_ellipsoids('', coords)
+            for coord in coords:
+                self._track_anno_center(coord)
 
     # VIEWER INTERACTION
     def _handle_select(self, action_state):
@@ -300,16 +361,22 @@ class NeuronProofreading(_ViewerBase2Col):
             # agglomeration viewer: retrieve segments and equivalences set
             eqv_set = s.layers[self.aggl_layer].equivalences.sets()
             viewer_seg = s.layers[self.aggl_layer].segments
-            segments_aggl = flat_list(eqv_set)
+            # map each segment to its agglomerated parent to replace the
+            # repeated linear membership scans below; the parent id is
+            # computed once per group, not once per member
+            seg_to_agglo = dict()
+            for grp in eqv_set:
+                agglo = min(grp)
+                for seg in grp:
+                    seg_to_agglo[seg] = agglo
 
             # Remove the agglomerated parent of segment_id from viewer and
             # equivalence dictionary if it is already in the viewer and/or
             # equivalence dictionary
-            if (any(viewer_seg) and segment_id in segments_aggl) \
+            if (any(viewer_seg) and segment_id in seg_to_agglo) \
                     or segment_id in viewer_seg:
-                if segment_id in segments_aggl:
-                    agglo_id = next(
-                        min(seg) for seg in eqv_set if segment_id in seg)
+                if segment_id in seg_to_agglo:
+                    agglo_id = seg_to_agglo[segment_id]
                 else:  # single segment that will not appear in the viewer
                     # equivalence dict
                     agglo_id = segment_id
@@ -322,7 +389,8 @@ class NeuronProofreading(_ViewerBase2Col):
                 # if edges to delete have already been identified, check whether
                 # segment_id is part of merged segment and make sure that the
                 # display reflects already performed correction locally
-                if any(flat_list(self.edges_to_delete)):
+                if self._deleted_src_ids \
+                        and not self._deleted_src_ids.isdisjoint(members):
                     edges_to_delete = [edge for edge in self.edges_to_delete
                                        if edge[0] in members]
                     if any(edges_to_delete):
@@ -352,13 +420,28 @@ class NeuronProofreading(_ViewerBase2Col):
             agglo_id(int) : updated id of the agglomerated parent
         """
         edge_list = self.graph_tools.get_edges(members)
-        temp_graph = LocalGraph()
-        temp_graph.add_edge(edge_list)
-        temp_graph.del_edge(edges_to_delete)
-        for cc_members in temp_graph.cc.values():
-            if segment_id in cc_members:
-                members = cc_members
-                break
+        if not any(isinstance(item, list) for item in edge_list):
+            # isolated segment(s) without edges in the neighborhood
+            return members, min(members)
+        # single BFS from segment_id with the locally deleted edges masked
+        # out, instead of building a temporary graph and enumerating all of
+        # its connected components
+        adjacency = dict()
+        for node1, node2 in edge_list:
+            adjacency.setdefault(node1, set()).add(node2)
+            adjacency.setdefault(node2, set()).add(node1)
+        deleted = {frozenset(edge) for edge in edges_to_delete}
+        component = {segment_id}
+        to_visit = [segment_id]
+        while to_visit:
+            node = to_visit.pop()
+            for partner in adjacency.get(node, ()):
+                if partner in component \
+                        or frozenset((node, partner)) in deleted:
+                    continue
+                component.add(partner)
+                to_visit.append(partner)
+        members = list(component)
         agglo_id = min(members)
         return members, agglo_id
 
@@ -386,18 +469,17 @@ class NeuronProofreading(_ViewerBase2Col):
         Pressing space will only toggle between 3d and xy-3d layout since
         orthogonal viewparts are not neededfor the proofreading
         """
-        s = deepcopy(self.viewer.state)
-        if s.layout.type == 'xy-3d':
-            s.layout.type = '3d'
-        elif s.layout.type == '3d':
-            s.layout.type = 'xy-3d'
-        elif s.layout.type == 'row':
-            msg = 'cannot toggle between xy-3D and 3D fullscreen mode when the ' \
-                  'viewer is in column layout'
-            self.upd_msg(msg)
-        else:
-            print('unexpected layout', s.layout)
-        self.viewer.set_state(s)
+        with self.viewer.txn() as s:
+            if s.layout.type == 'xy-3d':
+                s.layout.type = '3d'
+            elif s.layout.type == '3d':
+                s.layout.type = 'xy-3d'
+            elif s.layout.type == 'row':
+                msg = 'cannot toggle between xy-3D and 3D fullscreen mode ' \
+                      'when the viewer is in column layout'
+                self.upd_msg(msg)
+            else:
+                print('unexpected layout', s.layout)
 
     def _get_sv_id(self, action_state):
         """returns id of the segment at cursor position from a neuroglancer
@@ -441,11 +523,36 @@ class NeuronProofreading(_ViewerBase2Col):
         if segments:
             self.upd_viewer_segments(self.aggl_layer, [])
         else:
-            self._upd_viewer()
+            self._upd_viewer(clear_viewer=True)
+
+    @contextmanager
+    def _batched_viewer(self):
+        """Context manager that coalesces viewer updates
+
+        While the guard is active, _upd_viewer calls only record that an
+        update is due; a single update with the combined flags is pushed when
+        the outermost guard exits. This keeps actions that modify the graph
+        in several steps from redrawing the neuron more than once.
+        """
+        self._viewer_update_depth += 1
+        try:
+            yield
+        finally:
+            self._viewer_update_depth -= 1
+            if self._viewer_update_depth == 0 \
+                    and self._viewer_update_pending:
+                self._viewer_update_pending = False
+                clear_viewer = self._viewer_clear_pending
+                self._viewer_clear_pending = False
+                self._upd_viewer(clear_viewer=clear_viewer)
 
     def _upd_viewer(self, clear_viewer=False):
         """Updates display of neuron in the viewer based on the neuron's graph
 
+        Connected components that were already pushed to the viewer in an
+        earlier update are skipped, so the payload sent to neuroglancer scales
+        with the changes and not with the size of the neuron.
+
         Args:
             clear_viewer (Boolean) : flag to decide on clearance of neuroglancer
                                     equivalence dictionary and the agglomeration
@@ -453,16 +560,24 @@ class NeuronProofreading(_ViewerBase2Col):
                                      display changes after an edge has been
                                      split (optional).
         """
-        s = deepcopy(self.viewer.state)
-        if clear_viewer:
-            # force clearance of neuroglancer equivalence dictionary to
-            # visualize changes after split action
-            s.layers[self.aggl_layer].equivalences.clear()
-            s.layers[self.aggl_layer].segments = []
-        for cmp in self.graph.cc.values():
-            s.layers[self.aggl_layer].equivalences.union(*cmp)
-            s.layers[self.aggl_layer].segments.add(min(cmp))
-        self.viewer.set_state(s)
+        if self._viewer_update_depth > 0:
+            self._viewer_update_pending = True
+            self._viewer_clear_pending |= clear_viewer
+            return
+        with self.viewer.txn() as s:
+            if clear_viewer:
+                # force clearance of neuroglancer equivalence dictionary to
+                # visualize changes after split action
+                s.layers[self.aggl_layer].equivalences.clear()
+                s.layers[self.aggl_layer].segments = []
+                self._pushed_cc_hashes = set()
+            for cmp in self.graph.cc.values():
+                cc_hash = hash(frozenset(cmp))
+                if cc_hash in self._pushed_cc_hashes:
+                    continue
+                s.layers[self.aggl_layer].equivalences.union(*cmp)
+                s.layers[self.aggl_layer].segments.add(min(cmp))
+                self._pushed_cc_hashes.add(cc_hash)
 
     def _add_unconnected_sv_to_neuron(self, action_state):
         """Adds segments to the neuron's graph without adding an edge
@@ -476,21 +591,50 @@ class NeuronProofreading(_ViewerBase2Col):
         """
         sv = self._get_sv_id(action_state)
         if isinstance(sv, int):
-            msg = 'retrieving agglomeration information  for segment ' + str(sv)
+            msg = f'retrieving agglomeration information for segment {sv}'
             self.upd_msg(msg)
-            self.action_history.append(
-                {'add_segment': deepcopy(self.graph.graph)})
+            self._pending_svs.put(sv)
+            self._fetch_pool.submit(self._drain_add_queue)
+
+    def _drain_add_queue(self):
+        """Adds all queued segments to the neuron graph in one batch
 
-            Thread(target=self._add_to_graph, args=(sv,), daemon=True).start()
+        Consumes every segment id queued by _add_unconnected_sv_to_neuron at
+        once, so a burst of keypresses results in a single batched members
+        request instead of one fetch per press.
+        """
+        svs = []
+        try:
+            while True:
+                svs.append(self._pending_svs.get_nowait())
+        except queue.Empty:
+            pass
+        if svs:
+            self._add_to_graph(svs)
 
-    def _add_to_graph(self, sv):
-        """Adds a segment to neuron graph
+    def _add_to_graph(self, svs):
+        """Adds segments to neuron graph and records the applied diff in the
+        action history
 
         Args:
-            sv(int) : segment id
+            svs(list) : segment ids
         """
-        self._add_novel_sv_to_graph(sv)
+        edge_map = self.graph_tools.get_graph(svs)
+        added_nodes, added_edges = [], []
+        for sv, edges in edge_map.items():
+            if isinstance(edges[0], (int, np.integer)):
+                # segment has no partner in agglomeration
+                added_nodes += self.graph.add_node(edges[0])
+            else:
+                nodes, new_edges = self.graph.add_edge(edges)
+                added_nodes += nodes
+                added_edges += new_edges
+        self.action_history.append(
+            {'add_segment': [added_nodes, added_edges]})
         self._upd_viewer()
+        msg = f"segment(s) {', '.join(str(sv) for sv in svs)}" \
+              ' were added to the neuron graph'
+        self.upd_msg(msg)
 
     def _del_sv_from_neuron(self, action_state):
         """Deletes segments to the neuron's graph and triggers a viewer update.
@@ -503,17 +647,15 @@ class NeuronProofreading(_ViewerBase2Col):
        """
         sv = self._get_sv_id(action_state)
         if isinstance(sv, int):
-            if sv not in self.graph.graph.keys():
-                msg = 'Cursor misplaced. Segment' + str(sv) + \
+            if sv not in self.graph.graph:
+                msg = f'Cursor misplaced. Segment {sv} ' \
                       'was not found in the graph'
                 self.upd_msg(msg)
                 return
-            self.action_history.append(
-                {'del_segment': deepcopy(self.graph.graph)})
-            idx = next(idx for idx, members in self.graph.cc.items()
-                       if sv in members)
+            idx = self.graph.node_to_cc[sv]
             members = self.graph.cc[idx]
-            self.graph.del_node(members)
+            removed = self.graph.del_node(members)
+            self.action_history.append({'del_segment': removed})
             self._upd_viewer(clear_viewer=True)
 
     def cursor_misplaced_msg(self):
@@ -522,6 +664,27 @@ class NeuronProofreading(_ViewerBase2Col):
         self.upd_msg(msg)
 
     # DATA HANDLING
+    def _new_store(self, name):
+        """Creates an empty store for a revision data attribute
+
+        The high-volume stores are backed by typed arrays (see ap_utils), the
+        remaining attributes by CustomList.
+
+        Args:
+            name (str) : revision data attribute name, see var_names
+
+        Returns:
+            empty BranchPoints, IntArrayList or CustomList instance
+        """
+        if name == 'branch_point':
+            return BranchPoints(on_change=self._mark_dirty)
+        if name == 'edges_to_delete':
+            return IntArrayList(2, on_change=self._mark_dirty)
+        if name == 'segmentation_merger_loc':
+            return IntArrayList(3, dtype=np.int32,
+                                on_change=self._mark_dirty)
+        return CustomList([], on_change=self._mark_dirty)
+
     def _load_data(self, data):
         """function to load data from previous revision session and set viewer
         state to continue revision
@@ -535,9 +698,12 @@ class NeuronProofreading(_ViewerBase2Col):
         """
         try:
             for name in self.var_names:
-                temp = CustomList([])
+                temp = self._new_store(name)
                 temp += data[name]
                 setattr(self, name, temp)
+            self._rebuild_deleted_src_ids()
+            self._set_edge_keys = {frozenset(edge[1])
+                                   for edge in self.edges_to_set}
             self.graph.graph = data['neuron_graph']
             self.graph.update_cc()
         except:
@@ -545,41 +711,124 @@ class NeuronProofreading(_ViewerBase2Col):
                                  'loaded. Start review from scratch or check ' \
                                  'latest review file.'
 
+    def _mark_dirty(self):
+        """bumps the epoch counter that signals unsaved revision data changes
+        to the autosave"""
+        self._dirty_epoch += 1
+
     def _auto_save(self):
-        """Checks whether variables that need to be stored have been modified
-        during the last autosave interval and triggers data saving accordingly
+        """Triggers data saving if any of the variables that need to be stored
+        or the neuron graph have been modified during the last autosave
+        interval. An idle tick is an integer comparison and a flag read.
+
+        The graph flag is checked separately because callbacks like adding or
+        removing segments mutate only the graph and the untracked action
+        history, so they never bump the list-store epoch.
         """
-        changes = [
-            getattr(getattr(self, name), 'unsaved_changes')
-            for name in self.var_names
-        ]
-        if any(changes):
-            with self.lock:
-                self._save_data()
+        if self._dirty_epoch == self._last_saved_epoch \
+                and not self.graph.dirty:
+            return
+        self._save_data()
 
     def _save_data(self):
-        """Transforms revision data dictionary and saves it to a pickle file.
+        """Saves the revision data either as full snapshot or incremental delta
+
+        A full JSON snapshot rewrites the complete revision data including the
+        neuron graph and is only performed every _snapshot_interval saves, when
+        the neuron graph was modified or when one of the revision data lists
+        changed other than by appending. All saves in between append only the
+        items added since the last save to a JSON Lines sidecar file of the
+        latest snapshot. On loading, the snapshot is read first and the delta
+        log replayed on top (see run_proofreading).
+
+        The lock is only held while taking an in-memory snapshot of the
+        revision data, not during serialization, so keybinding callbacks are
+        not stalled by disk I/O.
+        """
+        snap = self._take_snapshot()
+        if snap['snapshot_due']:
+            self._write_full_snapshot(snap)
+        else:
+            self._append_save_delta(snap)
+
+    def _take_snapshot(self):
+        """Copies the revision data under the lock and clears the dirty flags.
+
+        Returns:
+            snap (dict) : shallow copies of the revision data lists and the
+                          neuron graph dict together with the save offsets and
+                          change flags needed to decide between full snapshot
+                          and delta append
+        """
+        with self.lock:
+            snap = {'lists': dict(), 'offsets': dict(), 'changed': dict()}
+            snap['snapshot_due'] = self._delta_fn is None \
+                or self._save_count % self._snapshot_interval == 0 \
+                or self.graph.dirty \
+                or any(getattr(self, name).structure_changed
+                       for name in self.var_names)
+            for name in self.var_names:
+                var = getattr(self, name)
+                snap['lists'][name] = list(var)
+                snap['offsets'][name] = var.last_saved_offset
+                snap['changed'][name] = var.unsaved_changes
+                var.unsaved_changes = False
+                var.structure_changed = False
+                var.last_saved_offset = len(var)
+            # clone the partner lists as well: serialization happens outside
+            # the lock and must not observe later graph mutations
+            snap['neuron_graph'] = clone_graph(self.graph.graph)
+            self.graph.dirty = False
+            self._last_saved_epoch = self._dirty_epoch
+            self._save_count += 1
+        snap['last_position'] = self.get_viewport_loc()
+        return snap
+
+    def _write_full_snapshot(self, snap):
+        """Writes the complete revision data snapshot to a new JSON file.
+
+        The current viewport position is saved to allow continuation of
+        revision from there.
 
-        All Customlist attributes are converted to regular lists. The current
-        viewport position is saved to allow continuation of revision from there.
+        Args:
+            snap (dict) : revision data snapshot, see _take_snapshot
         """
-        fn = '{0:%y%m%d}_{0:%H%M%S}_agglomerationReview.json'.format(
-            datetime.now())
+        now = datetime.now()
+        fn = now.strftime('%y%m%d_%H%M%S_agglomerationReview.json')
         sv_fn = os.path.join(self.dir_path, fn)
         new_data = dict()
         for name in self.var_names:
-            if name == 'action_history':
-                new_data[name] = []
-            else:
-                new_data[name] = list(getattr(self, name))
-        new_data['last_position'] = self.get_viewport_loc()
-        new_data['neuron_graph'] = self.graph.graph
-        new_data['ts'] = datetime.timestamp(datetime.now())
+            new_data[name] = snap['lists'][name]
+        # the action history only lives for the duration of a session, the
+        # key is kept for the saved data format
+        new_data['action_history'] = []
+        new_data['last_position'] = snap['last_position']
+        new_data['neuron_graph'] = snap['neuron_graph']
+        new_data['ts'] = now.timestamp()
         with open(sv_fn, 'w') as f:
-            json.dump(new_data, f, sort_keys=False, indent=3,
-                      separators=(',', ': '))
-        for name in self.var_names:
-            setattr(getattr(self, name), 'unsaved_changes', False)
+            if orjson is not None:
+                f.write(_json_dumps(new_data))
+            else:
+                json.dump(new_data, f, sort_keys=False, indent=3,
+                          separators=(',', ': '))
+        self._delta_fn = sv_fn.replace('.json', '_delta.jsonl')
+
+    def _append_save_delta(self, snap):
+        """Appends the items added since the last save to the delta log of the
+        latest full snapshot.
+
+        Args:
+            snap (dict) : revision data snapshot, see _take_snapshot
+        """
+        with open(self._delta_fn, 'a') as f:
+            for name in self.var_names:
+                if not snap['changed'][name]:
+                    continue
+                added = snap['lists'][name][snap['offsets'][name]:]
+                if added:
+                    f.write(_json_dumps({'name': name, 'added': added}) + '\n')
+            f.write(_json_dumps({'name': 'last_position',
+                                 'value': snap['last_position']}) + '\n')
 
     def _store_merger_loc(self):
         self.segmentation_merger_loc.append(self.get_viewport_loc())
@@ -595,24 +844,21 @@ class NeuronProofreading(_ViewerBase2Col):
     def _remove_branch_loc(self):
         """Flags last branch point location as visited and annotates it with
         an ellipsoid."""
-        if any(self.branch_point):
-            # get the last branchpoint set that has not been marked as visited
-            # (=>point[1] == False)
-            idx = max([i for i, point in enumerate(self.branch_point[:])
-                       if not point[1]])
-            self.annotation.make_ellipsoid('', self.branch_point[idx][0])
-            self.branch_point[idx][1] = True
+        # get the last branchpoint set that has not been marked as visited
+        idx = self.branch_point.last_unvisited()
+        if idx is not None:
+            coord = self.branch_point.coord(idx)
+            self.annotation.make_ellipsoid('', coord)
+            self._track_anno_center(coord)
+            self.branch_point.mark_visited(idx)
 
     def _jump_to_branch_loc(self):
         """Retrieves the last branch location that was set and sets the viewer
         position to that location."""
-        if any(self.branch_point):
-            bps = [i for i, point in enumerate(self.branch_point[:]) if
-                   not point[1]]
-            if any(bps):
-                idx = max(bps)
-                coord = self.branch_point[idx][0]
-                self.set_viewer_loc(coord)
+        if len(self.branch_point):
+            idx = self.branch_point.last_unvisited()
+            if idx is not None:
+                self.set_viewer_loc(self.branch_point.coord(idx))
             else:
                 msg = 'no branch points found'
                 self.upd_msg(msg)
@@ -620,23 +866,32 @@ class NeuronProofreading(_ViewerBase2Col):
             msg = 'no branch point found'
             self.upd_msg(msg)
 
+    def _track_anno_center(self, location):
+        """Registers the center of an annotation in the coordinate cache used
+        for the nearest-annotation lookup
+
+        Args:
+            location (list) : annotation center in voxel coordinates [x,y,z]
+        """
+        self._anno_centers = np.append(
+            self._anno_centers, np.asarray([location], dtype=np.float32),
+            axis=0)
+
     def _delete_closest_annotation(self, action_state):
-        s = deepcopy(self.viewer.state)
-        annotations = s.layers[''].annotations
-        id_loc_map = list()
-        for item in annotations:
-            id_loc_map.append(item.center)
-        if id_loc_map:
-            try:
-                picked_coord = np.array(action_state.mouseVoxelCoordinates)
-                idx = np.linalg.norm(picked_coord - np.array(id_loc_map),
-                                     axis=1).argmin()
-
-                annotations.pop(idx)
-                self.viewer.set_state(s)
-            except KeyError:
-                self.upd_msg('could not delete annotation')
-                return
+        if not len(self._anno_centers):
+            return
+        try:
+            picked_coord = np.asarray(action_state.mouseVoxelCoordinates,
+                                      dtype=np.float32)
+            # squared distances via einsum, the sqrt is irrelevant for argmin
+            diff = self._anno_centers - picked_coord
+            idx = int(np.einsum('ij,ij->i', diff, diff).argmin())
+            with self.viewer.txn() as s:
+                s.layers[''].annotations.pop(idx)
+            self._anno_centers = np.delete(self._anno_centers, idx, axis=0)
+        except (KeyError, TypeError):
+            self.upd_msg('could not delete annotation')
+            return
 
     # MERGE FALSE SPLITS
     def _get_edge_information(self, action_state, idx):
@@ -686,27 +941,32 @@ class NeuronProofreading(_ViewerBase2Col):
         Temporary attributes for edge setting are checked. The action history is
          updated and the setting of the edge directed.
         """
-        break_condition = [0 in self.set_edge_ids_temp,
-                           None in self.set_edge_ids_temp,
-                           self.set_edge_ids_temp[0] == self.set_edge_ids_temp[
-                               1],
-                           len(self.set_edge_ids_temp) != 2
-                           ]
-        if any(break_condition):
+        # short-circuiting checks instead of building a condition list;
+        # the length test has to come first so the unpacking cannot fail
+        if len(self.set_edge_ids_temp) != 2:
+            self.cursor_misplaced_msg()
+            return
+        sv1, sv2 = self.set_edge_ids_temp
+        if sv1 in (0, None) or sv2 in (0, None) or sv1 == sv2:
             self.cursor_misplaced_msg()
             return
         else:
-            self.action_history.append({'set': deepcopy(self.graph.graph)})
-
             # ensure only one edge can be set between a given pair of svs and
-            # allow updating the location entry for a pair in edge_to_set
-            self.edges_to_set.update([edge for edge in self.edges_to_set
-                                      if set(edge[1]) != set(
-                    self.set_edge_ids_temp)])
+            # allow updating the location entry for a pair in edge_to_set.
+            # The key set makes the duplicate test O(1); only an actual
+            # duplicate (rare) pays for rebuilding the list
+            key = frozenset(self.set_edge_ids_temp)
+            if key in self._set_edge_keys:
+                self.edges_to_set.update(
+                    [edge for edge in self.edges_to_set
+                     if set(edge[1]) != set(self.set_edge_ids_temp)])
+            else:
+                self._set_edge_keys.add(key)
             self.edges_to_set.append(
                 [self.set_edge_loc_temp, self.set_edge_ids_temp])
 
-            self._direct_edge_setting()
+            with self._batched_viewer():
+                self._direct_edge_setting()
 
     def _direct_edge_setting(self):
         """Directs setting of an edge
@@ -715,13 +975,16 @@ class NeuronProofreading(_ViewerBase2Col):
         BrainMaps API and added to the neuron's graph.
         """
         novel_svs = [sv_id for sv_id in self.set_edge_ids_temp
-                     if sv_id not in self.graph.graph.keys()]
+                     if sv_id not in self.graph.graph]
+        # a slice copy suffices to guard the two-int edge against mutation
+        # from the main thread, deepcopy is needless overhead here
         if novel_svs:
-            Thread(target=self._add_edge_to_novel_sv,
-                   args=(novel_svs, deepcopy(self.set_edge_ids_temp),),
-                   daemon=True).start()
+            # reuse the bounded worker pool instead of spawning a fresh
+            # daemon thread per merge action
+            self._fetch_pool.submit(self._add_edge_to_novel_sv, novel_svs,
+                                    list(self.set_edge_ids_temp))
         else:
-            self._set_edge(deepcopy(self.set_edge_ids_temp))
+            self._set_edge(list(self.set_edge_ids_temp))
 
     def _add_edge_to_novel_sv(self, novel_svs, edge):
         """Adds an edge when at least one of the segments is not yet part of the
@@ -732,39 +995,41 @@ class NeuronProofreading(_ViewerBase2Col):
                               neuron graph
             edge(list) : edge to set
         """
-        for sv in novel_svs:
-            self._add_novel_sv_to_graph(sv)
-        self._set_edge(edge)
-
-    def _add_novel_sv_to_graph(self, sv):
-        """Retrieves the agglomeration graph of sv via the BrainMapsApi and adds
-         it to the neuron, displays msg upon finishing
-
-        The lengthy API request that should run on a separate thread to free the
-        main thread
-
-        Args:
-            sv (int) : segment id
-        """
-        edges = self.graph_tools.get_graph(sv)[sv]
-        if isinstance(edges[0], int):  # segment has no partner in agglomeration
-            self.graph.add_node(edges[0])
-        else:
-            self.graph.add_edge(edges)
-
-        msg = 'segment ' + str(sv) + ' was added to the neuron graph'
+        # one batched BrainMaps round trip for all novel segments instead of
+        # one request per segment
+        edge_map = self.graph_tools.get_graph(novel_svs)
+        added_nodes, added_edges = [], []
+        for sv, edges in edge_map.items():
+            if isinstance(edges[0], (int, np.integer)):
+                # segment has no partner in agglomeration
+                added_nodes += self.graph.add_node(edges[0])
+            else:
+                nodes, new_edges = self.graph.add_edge(edges)
+                added_nodes += nodes
+                added_edges += new_edges
+        msg = f"segment(s) {', '.join(str(sv) for sv in novel_svs)}" \
+              ' were added to the neuron graph'
         self.upd_msg(msg)
+        self._set_edge(edge, added_nodes, added_edges)
 
-    def _set_edge(self, edge):
-        """Sets an edge, updates viewer and displays according message
+    def _set_edge(self, edge, added_nodes=None, added_edges=None):
+        """Sets an edge, records the applied diff in the action history,
+        updates viewer and displays according message
 
         Args:
             edge(list) : pair of segment ids between which an edge should be set
+            added_nodes (list, optional) : nodes already added to the graph as
+                                           part of this action
+            added_edges (list, optional) : edges already added to the graph as
+                                           part of this action
         """
-        self.graph.add_edge(edge)
+        nodes, edges = self.graph.add_edge(edge)
+        self.action_history.append(
+            {'set': [(added_nodes or []) + nodes,
+                     (added_edges or []) + edges]})
+        self.graph_tools.clear_cache()
         self._upd_viewer()
-        msg = 'an edge was set between ' + str(edge[0]) + \
-              ' and ' + str(edge[1])
+        msg = f'an edge was set between {edge[0]} and {edge[1]}'
         self.upd_msg(msg)
 
     # SPLIT FALSE MERGER
@@ -777,34 +1042,55 @@ class NeuronProofreading(_ViewerBase2Col):
         """
         segment = self._get_sv_id(action_state)
         if segment is not None and segment != 0:
-            self.upd_msg('retrieving segments connected to ' + str(segment))
+            self.upd_msg(f'retrieving segments connected to {segment}')
             self.del_edge_ids = [segment]
             # retrieve partners locally if segment is already in the graph
             # -> allows to split edges that were only set locally (should be
             # undone with crtl+z though)
-            if segment in self.graph.graph.keys():
+            if segment in self.graph.graph:
                 partners = self.graph.graph[segment] + [segment]
                 msg = 'Move cursor to falsely merged partner and press ctrl+x to ' \
                       'split'
+                self.upd_viewer_segments(self.base_layer, partners)
+                self.upd_msg(msg)
             else:
-                edges = self.graph_tools.get_edges(segment)
-                if any(isinstance(item, list) for item in edges):
-                    partners = set(flat_list(edges))
-                    msg = 'Mergers cannot be split: The selected segment is not ' \
-                          'assigned to the neuron graph.'
-                elif any(isinstance(item, int) for item in edges):
-                    partners = segment
-                    msg = 'The selected segment has no partners'
-                else:
-                    print('show_connected_partners return unexpected result'
-                          ' for segment', segment)
-            self.upd_viewer_segments(self.base_layer, partners)
-
-            self.upd_msg(msg)
+                # show the segment itself right away and fetch the remote
+                # partners on the worker pool so the action callback does not
+                # stall on the network round trip
+                self.upd_viewer_segments(self.base_layer, [segment])
+                self._fetch_pool.submit(self._fetch_connected_partners,
+                                        segment)
         else:
             msg = 'cursor misplaced'
             self.upd_msg(msg)
 
+    def _fetch_connected_partners(self, segment):
+        """Retrieves the partners of segment via the BrainMaps API and updates
+        the base volume display.
+
+        Runs on the worker pool; the result is dropped if another segment was
+        selected in the meantime.
+
+        Args:
+            segment (int) : segment id
+        """
+        edges = self.graph_tools.get_edges(segment)
+        if any(isinstance(item, list) for item in edges):
+            # chain.from_iterable flattens in C, no intermediate list
+            partners = set(chain.from_iterable(edges))
+            msg = 'Mergers cannot be split: The selected segment is not ' \
+                  'assigned to the neuron graph.'
+        elif any(isinstance(item, (int, np.integer)) for item in edges):
+            partners = segment
+            msg = 'The selected segment has no partners'
+        else:
+            print('show_connected_partners return unexpected result'
+                  ' for segment', segment)
+            return
+        if self.del_edge_ids and self.del_edge_ids[0] == segment:
+            self.upd_viewer_segments(self.base_layer, partners)
+            self.upd_msg(msg)
+
     def _split_merger(self, action_state):
         """Splits the edge between the segments in the temporary del_edge_ids,
         updates the neuron's graph & the viewer.
@@ -815,19 +1101,21 @@ class NeuronProofreading(_ViewerBase2Col):
         if not self.del_edge_ids:
             return
         segment = self._get_sv_id(action_state)
-        if not (self.del_edge_ids[0] in self.graph.graph.keys()
-                and segment in self.graph.graph.keys()):
+        if not (self.del_edge_ids[0] in self.graph.graph
+                and segment in self.graph.graph):
             msg = 'The segments to split have to be both part of the neuron\'s' \
                   ' graph'
             self.upd_msg(msg)
             return
         if segment is not None and segment != 0:
-            self.upd_msg('splitting edge between ' + str(segment) + ' and ' +
-                         str(self.del_edge_ids[0]))
+            self.upd_msg(f'splitting edge between {segment} and '
+                         f'{self.del_edge_ids[0]}')
             self.del_edge_ids.append(segment)
-            self.action_history.append({'del': deepcopy(self.graph.graph)})
-            self.graph.del_edge(self.del_edge_ids)
+            removed_edges = self.graph.del_edge(self.del_edge_ids)
+            self.action_history.append({'del': removed_edges})
             self.edges_to_delete.append(self.del_edge_ids)
+            self._deleted_src_ids.add(self.del_edge_ids[0])
+            self.graph_tools.clear_cache()
             self.del_edge_ids = []
             self._upd_viewer(clear_viewer=True)
             msg = 'Check if the false merger has been successfully split. If ' \
@@ -853,8 +1141,11 @@ class NeuronProofreading(_ViewerBase2Col):
             self.upd_msg(msg)
             return
         self.upd_msg('updating neuron graph after merge split')
-        cc_id = next(idx for idx, members in self.graph.cc.items()
-                     if sv_id in members)
+        cc_id = self.graph.node_to_cc.get(sv_id)
+        if cc_id is None:
+            msg = f'Segment {sv_id} was not found in the graph'
+            self.upd_msg(msg)
+            return
         self.graph.del_node(self.graph.cc[cc_id])
         self._upd_viewer(clear_viewer=True)
         self.upd_msg('Done!')
@@ -866,38 +1157,61 @@ class NeuronProofreading(_ViewerBase2Col):
         segments = [int(item) for item in
                     self.viewer.state.layers[self.base_layer].segments]
         self.upd_msg('removing segments ')
-        if all([sv in self.graph.graph.keys() for sv in segments]):
-            edge_list = self.graph.return_edge_list(segments)
-        else:
-            edge_list = self.graph_tools.get_edges(segments)
+        with self._batched_viewer():
+            # keys-view superset test runs in C without building a throwaway
+            # list
+            if self.graph.graph.keys() >= set(segments):
+                edge_list = self.graph.return_edge_list(segments)
+            else:
+                edge_list = self.graph_tools.get_edges(segments)
 
-        edges_to_remove = isolate_set(segments, edge_list)
-        self.action_history.append(
-            {'split': [edges_to_remove,
-                       deepcopy(self.graph.graph)]})
-        self.edges_to_delete += edges_to_remove
-        self.graph.del_node(segments)
-        self._upd_viewer(clear_viewer=True)
+            edges_to_remove = list(isolate_set(segments, edge_list))
+            self.edges_to_delete += edges_to_remove
+            self._deleted_src_ids.update(edge[0] for edge in edges_to_remove)
+            removed = self.graph.del_node(segments)
+            self.action_history.append({'split': [edges_to_remove, removed]})
+            self._upd_viewer(clear_viewer=True)
         self.upd_msg('Done!')
 
     # UNDO FUNCTIONS
     def _undo_last_action(self):
-        """Revokes last action modifying the neuron's graph."""
-        if any(self.action_history):
-            last_action = [*self.action_history[-1].keys()][0]
-            self.graph.graph = self.action_history[-1][last_action]
-            if last_action == 'set':
-                self.edges_to_set.pop()
+        """Revokes last action modifying the neuron's graph by replaying the
+        inverse of the recorded diff."""
+        if not any(self.action_history):
+            return
+        record = self.action_history.pop()
+        last_action = next(iter(record))
+        payload = record[last_action]
+        with self._batched_viewer():
+            if last_action in ('add_segment', 'set'):
+                added_nodes, added_edges = payload
+                self.graph.del_node(added_nodes)
+                # edges between nodes that were already in the graph before
+                # the action are not removed along with the added nodes
+                remaining = [edge for edge in added_edges
+                             if edge[0] not in added_nodes
+                             and edge[1] not in added_nodes]
+                if remaining:
+                    self.graph.del_edge(remaining)
+                if last_action == 'set':
+                    self._set_edge_keys.discard(
+                        frozenset(self.edges_to_set[-1][1]))
+                    self.edges_to_set.pop()
+            elif last_action == 'del_segment':
+                self.graph.restore_nodes(payload)
             elif last_action == 'del':
+                if payload:
+                    self.graph.add_edge(payload)
                 self.edges_to_delete.pop()
+                self._rebuild_deleted_src_ids()
             elif last_action == 'split':
-                self.graph.graph = self.action_history[-1][last_action][-1]
-                edges_removed = self.action_history[-1][last_action][0]
+                edges_removed, removed_adjacency = payload
+                self.graph.restore_nodes(removed_adjacency)
                 self.edges_to_delete -= edges_removed
-
-            if self.graph.graph.keys():
-                self.graph.update_cc()
-            else:
-                self.graph.cc = dict()
+                self._rebuild_deleted_src_ids()
             self._upd_viewer(clear_viewer=True)
-            self.action_history.pop(-1)
+
+    def _rebuild_deleted_src_ids(self):
+        """recomputes the set of first ids of the locally deleted edges after
+        removals from edges_to_delete"""
+        self._deleted_src_ids = {edge[0] for edge in self.edges_to_delete}
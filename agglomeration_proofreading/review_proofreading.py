@@ -1,12 +1,31 @@
-import json
-
-from copy import deepcopy
 from datetime import datetime
-from pathlib import PurePath, Path
+from functools import wraps
+from pathlib import Path
 
-from agglomeration_proofreading.neuron_proofreader import NeuronProofreading
+from agglomeration_proofreading.neuron_proofreader import (NeuronProofreading,
+                                                           _json_dumps)
+from agglomeration_proofreading.neuron_graph import clone_graph
 from agglomeration_proofreading.ap_utils import flat_list
 
+# resolved once at import: the keybinding file lives next to this module and
+# resolve() walks the filesystem on every call otherwise
+_KEYBINDINGS_MASTER = Path(__file__).resolve().parent.joinpath(
+    'KEYBINDINGS_master.ini')
+
+
+def _requires_updated_graph(fn):
+    """wraps a graph-modifying callback so that it is blocked with a message
+    while the initial graph before proofreading is displayed"""
+
+    @wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        if self.current_graph != 'updated':
+            self.display_action_forbidden_msg()
+            return
+        return fn(self, *args, **kwargs)
+
+    return wrapper
+
 
 class ProofreaderMaster(NeuronProofreading):
     def __init__(self,
@@ -62,16 +81,26 @@ class ProofreaderMaster(NeuronProofreading):
         # initiate edge_lists for visiting edges set/deleted and modifying
         # edges de novo
         self.edge_clusters = edge_clusters
+        # cluster keys in iteration order, cached once: cluster entries are
+        # modified but never added or removed during review
+        self._cluster_keys = list(edge_clusters.keys())
         self.cluster_centroids = [centroid for centroid in edge_clusters.keys()]
         # list in which the individual edges centers in a cluster get placed
         self.single_edge_list = []
         self.single_edge_list_ids = []
+        # memo of the segment ids per cluster, filled lazily and invalidated
+        # when an edge is deleted from a cluster
+        self._cluster_sv_ids = dict()
 
         self.coord_list_names = ['cluster_centroids', 'single_edge_list']
         if edges_to_delete_coord is not None:
             self.check_deleted_edges = edges_to_delete_coord[0]
             self.check_deleted_edges_ids = edges_to_delete_coord[1]
             self.coord_list_names.append('check_deleted_edges')
+        # coord_list_names is final from here on, so the name positions can be
+        # looked up via dict instead of list.index scans
+        self._name_to_map_idx = {name: idx for idx, name
+                                 in enumerate(self.coord_list_names)}
         self.mk_coord_list_maps()
         self.toggle_location_lists()
 
@@ -89,26 +118,31 @@ class ProofreaderMaster(NeuronProofreading):
         self.viewer.actions.add('delete_cur_coord_list_item',
                                 lambda s: self.delete_cur_coord_list_item())
 
-        _DEFAULT_DIR = PurePath(Path(__file__).resolve()).parent
-        fn = 'KEYBINDINGS_master.ini'
-        config_file = _DEFAULT_DIR.joinpath(fn)
-        if not Path(config_file).is_file():
+        if not _KEYBINDINGS_MASTER.is_file():
             raise FileNotFoundError
-        self._bind_pairs(config_file)
+        self._bind_pairs(_KEYBINDINGS_MASTER)
 
     def toggle_old_new_graph(self):
-        """"""
+        """Swaps the displayed graph between the updated and the initial state
+
+        The swap is a plain exchange of state tuples: the graph before
+        update is always an independent copy (see _mk_fake_initial_graph
+        and toggle_location_lists), so while only the merge callbacks are
+        blocked by _requires_updated_graph, any other edit made while the
+        initial graph is displayed mutates a throwaway clone and never the
+        reference data. The connected components travel with each graph in
+        its state tuple, so toggling requires no copy and no component
+        recomputation.
+        """
         if self.current_graph == 'updated':
-            self.updated_graph = deepcopy(self.graph.graph)
-            self.graph.graph = deepcopy(self.graph_before_update)
-            self.graph.update_cc()
+            self.updated_graph = self.graph.export_state()
+            self.graph.import_state(self.graph_before_update)
             self.graph_before_update = None
             self.current_graph = 'initial'
             self._upd_viewer(clear_viewer=True)
         elif self.current_graph == 'initial':
-            self.graph_before_update = deepcopy(self.graph.graph)
-            self.graph.graph = deepcopy(self.updated_graph)
-            self.graph.update_cc()
+            self.graph_before_update = self.graph.export_state()
+            self.graph.import_state(self.updated_graph)
             self.updated_graph = None
             self.current_graph = 'updated'
             self._upd_viewer(clear_viewer=True)
@@ -116,34 +150,16 @@ class ProofreaderMaster(NeuronProofreading):
             raise ValueError('this should be impossible')
 
     # overwrite callbacks that modify the graph to prevent modifying the initial
-    # graph instead of the updated
-    def _get_sv1_for_merging(self, action_state):
-        """"""
-        if self.current_graph == 'initial':
-            self.display_action_forbidden_msg()
-        elif self.current_graph == 'updated':
-            super()._get_sv1_for_merging(action_state)
-
-    def _get_sv2_for_merging(self, action_state):
-        """"""
-        if self.current_graph == 'initial':
-            self.display_action_forbidden_msg()
-        elif self.current_graph == 'updated':
-            super()._get_sv2_for_merging(action_state)
-
-    def _show_connected_partners(self, action_state):
-        """"""
-        if self.current_graph == 'initial':
-            self.display_action_forbidden_msg()
-        elif self.current_graph == 'updated':
-            super()._show_connected_partners(action_state)
-
-    def _remove_merged_group(self):
-        """"""
-        if self.current_graph == 'initial':
-            self.display_action_forbidden_msg()
-        elif self.current_graph == 'updated':
-            super()._remove_merged_group()
+    # graph instead of the updated; the decorator closes over the parent method
+    # directly which also avoids the super() dispatch per keypress
+    _get_sv1_for_merging = _requires_updated_graph(
+        NeuronProofreading._get_sv1_for_merging)
+    _get_sv2_for_merging = _requires_updated_graph(
+        NeuronProofreading._get_sv2_for_merging)
+    _show_connected_partners = _requires_updated_graph(
+        NeuronProofreading._show_connected_partners)
+    _remove_merged_group = _requires_updated_graph(
+        NeuronProofreading._remove_merged_group)
 
     def display_action_forbidden_msg(self):
         """messages that action is forbidden because current graph is the
@@ -156,13 +172,18 @@ class ProofreaderMaster(NeuronProofreading):
         """"""
         # single edges lists corresponding to current cluster should only ever
         # start at idx 0
-        if self.coord_list_names[
-            self.cur_coord_list_idx] == 'single_edge_list':
+        if self.coord_list_names[self.cur_coord_list_idx] == 'single_edge_list':
             self.cur_coord_idx = 0
         super().toggle_location_lists()
         if self.coord_list_names[
-            self.cur_coord_list_idx] == 'check_deleted_edges':
-            self.graph_before_update = self.initial_graph
+                self.cur_coord_list_idx] == 'check_deleted_edges':
+            # components of the true initial graph are recomputed lazily;
+            # cloned because import_state adopts the dict without copying and
+            # only the merge callbacks are blocked while the initial graph is
+            # displayed - any other edit must hit a throwaway copy, not the
+            # reference graph
+            self.graph_before_update = (clone_graph(self.initial_graph),
+                                        None, None)
 
     def set_current_location(self):
         """displays the base segments of the edges set or deleted"""
@@ -172,39 +193,42 @@ class ProofreaderMaster(NeuronProofreading):
     def delete_cur_coord_list_item(self):
         """remove edge fom id list as well to maintain consistency for segments
         displayed"""
-        if self.coord_list_names[
-            self.cur_coord_list_idx] == 'cluster_centroids':
+        name = self.coord_list_names[self.cur_coord_list_idx]
+        if name == 'cluster_centroids':
             msg = 'Current list = check_edges_to_set! Clusters cannot be ' \
                   'deleted'
             self.upd_msg(msg)
             return
 
         super().delete_cur_coord_list_item()
-        if self.coord_list_names[self.cur_coord_list_idx] == 'single_edge_list':
+        if name == 'single_edge_list':
             self.single_edge_list_ids.pop(self.cur_coord_idx)
             # remove edge from the cluster lists as well
             curr_cluster_idx = self.coord_list_idx_map[0]
-            current_key = list(self.edge_clusters.keys())[curr_cluster_idx]
+            current_key = self._cluster_keys[curr_cluster_idx]
             self.edge_clusters[current_key][2].pop(self.cur_coord_idx)
-        elif self.coord_list_names[
-            self.cur_coord_list_idx] == 'check_deleted_edges':
-            self.edges_to_delete_ids.pop(self.cur_coord_idx)
+            self._cluster_sv_ids.pop(current_key, None)
+        elif name == 'check_deleted_edges':
+            self.check_deleted_edges_ids.pop(self.cur_coord_idx)
 
     def _handle_next_list_item(self):
         """"""
-        if self.coord_list_names[
-            self.cur_coord_list_idx
-        ] == 'cluster_centroids':
-            current_key = list(self.edge_clusters.keys())[self.cur_coord_idx]
-            edge_ids = self.edge_clusters[current_key][1]
-            edge_center_coord = self.edge_clusters[current_key][0]
-
-            # segment ids of the current cluster
-            sv_ids = set(flat_list(self.edge_clusters[current_key][1]))
+        name = self.coord_list_names[self.cur_coord_list_idx]
+        if name == 'cluster_centroids':
+            current_key = self._cluster_keys[self.cur_coord_idx]
+            cluster = self.edge_clusters[current_key]
+            edge_ids = cluster[1]
+            edge_center_coord = cluster[0]
+
+            # segment ids of the current cluster, computed once per cluster
+            sv_ids = self._cluster_sv_ids.get(current_key)
+            if sv_ids is None:
+                sv_ids = frozenset(flat_list(edge_ids))
+                self._cluster_sv_ids[current_key] = sv_ids
             # prepare lists for single edges of this cluster
             self.single_edge_list = edge_center_coord
             self.single_edge_list_ids = edge_ids
-            map_idx = self.coord_list_names.index('single_edge_list')
+            map_idx = self._name_to_map_idx['single_edge_list']
             self.coord_list_map[map_idx] = self.single_edge_list
 
             # print('Edges to be deleted:', edge_ids)
@@ -213,12 +237,9 @@ class ProofreaderMaster(NeuronProofreading):
             # cluster are missing
             self._mk_fake_initial_graph(edge_ids)
 
-        elif self.coord_list_names[
-            self.cur_coord_list_idx
-        ] == 'check_deleted_edges':
-            sv_ids = self.edges_to_delete_ids[self.cur_coord_idx]
-        elif self.coord_list_names[
-            self.cur_coord_list_idx] == 'single_edge_list':
+        elif name == 'check_deleted_edges':
+            sv_ids = self.check_deleted_edges_ids[self.cur_coord_idx]
+        elif name == 'single_edge_list':
             sv_ids = self.single_edge_list_ids[self.cur_coord_idx]
         else:
             print('this should not happen')
@@ -238,12 +259,24 @@ class ProofreaderMaster(NeuronProofreading):
         # representation to calculate graph before local update
         if self.current_graph == 'initial':
             self.toggle_old_new_graph()
-        # store updated graph in temp variable:
-        temp = deepcopy(self.graph.graph)
+        # save the adjacency lists the deletion will touch instead of copying
+        # the whole graph, and park the live component caches
+        saved = {node: self.graph.graph[node][:] for edge in edges
+                 for node in edge if node in self.graph.graph}
+        live_state = self.graph.export_state()
         # delete edges in list to calculate graph before update
         self.graph.del_edge(edges)
-        self.graph_before_update = self.graph.graph
-        self.graph.graph = temp
+        # flat two-level copy so the snapshot stays independent of later
+        # edits to the updated graph; exporting recomputes the components
+        # for the fake graph which then travel with its state tuple
+        _, fake_cc, fake_node_to_cc = self.graph.export_state()
+        self.graph_before_update = (clone_graph(self.graph.graph), fake_cc,
+                                    fake_node_to_cc)
+        # restore the updated graph by putting the saved lists back and
+        # re-adopting the parked component caches
+        for node, partners in saved.items():
+            self.graph.graph[node] = partners
+        self.graph.import_state(live_state)
 
     def _auto_save(self):
         """"""
@@ -251,8 +284,7 @@ class ProofreaderMaster(NeuronProofreading):
 
     def _save_data(self):
         """"""
-        fn = '{0:%y%m%d}_{0:%H%M%S}_ProofreadingReview.json'.format(
-            datetime.now())
+        fn = datetime.now().strftime('%y%m%d_%H%M%S_ProofreadingReview.json')
         sv_fn = Path(self.dir_path).joinpath(fn)
         # store edges to set in with coordinates and ids in different sublist
         edges_ids = []
@@ -276,6 +308,8 @@ class ProofreaderMaster(NeuronProofreading):
         reviewed_data['edges_to_set'] = [edge_coord, edges_ids]
         reviewed_data['edges_to_delete'] = edges_to_delete
 
+        # compact serialization, with orjson at C speed where installed (see
+        # _json_dumps); the stdlib indent path costs a multiple on the
+        # numeric-heavy edge lists
         with open(sv_fn, 'w') as f:
-            json.dump(reviewed_data, f, sort_keys=False, indent=3,
-                      separators=(',', ': '))
+            f.write(_json_dumps(reviewed_data))
@@ -1,12 +1,57 @@
+import heapq
 import neuroglancer
 import os
-from agglomeration_proofreading.ap_utils import return_other
-from copy import deepcopy
 from configparser import ConfigParser
-from selenium import webdriver
-from threading import Thread, Event
+from functools import lru_cache
+from itertools import count
+from threading import Thread, Event, Lock, Condition
+from time import monotonic, sleep
 from agglomeration_proofreading.ap_utils import int_to_list
 
+# chromedriver startup dominates browser launch time, so a single driver is
+# shared across viewer instances: the first viewer spawns Chrome, later ones
+# open their page in a new tab. Each viewer closes only its own tab on exit;
+# the browser quits with the last one.
+_SHARED_DRIVER = None
+_shared_driver_lock = Lock()
+
+# viewers released by _clean_exit are parked here and recycled by the next
+# session, keeping the neuroglancer Tornado server warm and avoiding token
+# registration per viewer
+_VIEWER_POOL = []
+_viewer_pool_lock = Lock()
+
+# token files written by the brainmaps authentication, expanded once
+_APITOKEN = os.path.expanduser('~/.apitools.token')
+_APITOKEN_LOCK = _APITOKEN + '.lock'
+
+# fallback directory for the keybinding ini files shipped with the package
+_DEFAULT_INI_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@lru_cache(maxsize=None)
+def _load_keybindings(ini_file, mtime):
+    """parses a keybindings ini file into plain dicts, cached per file
+
+    The mtime argument only serves as part of the cache key so that an
+    edited file is re-parsed while repeated viewer constructions reuse the
+    parsed result.
+
+    Args:
+        ini_file (str) : path to the keybindings ini file
+        mtime (float) : modification time of the file
+
+    Returns:
+        dict mapping action name to key and dict mapping action name to
+        binding group
+    """
+    with open(ini_file, 'r', encoding='utf-8') as f:
+        data = f.read()
+    keybindings = ConfigParser()
+    keybindings.read_string(data)
+    return (dict(keybindings['KEYBINDINGS']),
+            dict(keybindings['BINDING_GROUP']))
+
 
 # Todo: outsource to separate package?
 #  make more flexible viewer intiation, e.g. allow to read viewerstate from URl
@@ -51,6 +96,10 @@ class _ViewerBase:
         timer : see class Timer
         """
 
+    # maps the current selectedAlpha value of a layer to the next one in the
+    # opacity cycle
+    _OPACITY_CYCLE = {0: .25, .25: .5, .5: 0}
+
     def __init__(self,
                  raw_data='',
                  layers={},
@@ -58,6 +107,8 @@ class _ViewerBase:
                  annotation=False,
                  timer_interval=None,
                  remove_token=True,
+                 headless=False,
+                 user_data_dir=None,
                  **kwargs):
         """Initiates viewer base class by
 
@@ -78,15 +129,25 @@ class _ViewerBase:
             remove_token (bool) : determines whether to remove personalised
                                   token created during the neuroglancer
                                   authentication procedure
+            headless (bool) : runs Chrome without a visible window, useful
+                              for batch pipelines, optional
+            user_data_dir (str) : path to a persistent Chrome profile
+                                  directory; reusing one skips first-run
+                                  profile creation on launch, optional
         """
         self.dimensions = None
-        self.viewer = neuroglancer.Viewer()
+        with _viewer_pool_lock:
+            if _VIEWER_POOL:
+                self.viewer = _VIEWER_POOL.pop()
+            else:
+                self.viewer = neuroglancer.Viewer()
         if annotation:
             self.annotation_flag = True
             self.annotation = Annotations(viewer=self.viewer)
             self.get_dimensions_timer = Timer(.1)
         else:
             self.annotation_flag = False
+        self.timer = None
         if timer_interval is not None:
             self.timer = Timer(timer_interval)
 
@@ -106,8 +167,21 @@ class _ViewerBase:
 
         self.remove_token = remove_token
         self.exit_event = Event()
+        # last status message and its timestamp for the upd_msg debounce,
+        # plus the latest message of a burst awaiting its coalesced flush
+        self._last_msg = None
+        self._last_msg_ts = 0.0
+        self._pending_msg = None
+        self._msg_flush_scheduled = False
+        self._msg_lock = Lock()
         self._driver = None
+        self._tab_handle = None
+        self._headless = headless
+        self._user_data_dir = user_data_dir
         self._init_viewer(raw_data, layers, viewer_state)
+        # the URL only depends on the server address and the viewer token, so
+        # it is computed once instead of re-serializing state per consumer
+        self._viewer_url = self.viewer.get_viewer_url()
         self._set_keybindings()
         self._run_browser()
 
@@ -139,24 +213,23 @@ class _ViewerBase:
         if viewer_state is not None:
             self.viewer.set_state(viewer_state)
         else:
-            s = deepcopy(self.viewer.state)
-            if isinstance(raw_data, str):
-                s.layers['raw'] = neuroglancer.ImageLayer(source=raw_data)
-            elif isinstance(raw_data, list):
-                for i, data_src in enumerate(raw_data):
-                    s.layers['raw{}'.format(i)] = neuroglancer.ImageLayer(
-                        source=data_src)
-            for name, src in layers.items():
-                s.layers[name] = neuroglancer.SegmentationLayer(source=src)
+            with self.viewer.txn() as s:
+                if isinstance(raw_data, str):
+                    s.layers['raw'] = neuroglancer.ImageLayer(source=raw_data)
+                elif isinstance(raw_data, list):
+                    for i, data_src in enumerate(raw_data):
+                        s.layers['raw{}'.format(i)] = neuroglancer.ImageLayer(
+                            source=data_src)
+                for name, src in layers.items():
+                    s.layers[name] = neuroglancer.SegmentationLayer(source=src)
+                s.layout = 'xy-3d'
+                s.showSlices = False
             # refactor to method that builds one or mor annotation layers
             if self.annotation_flag:
                 name = next(iter(layers.values()))
                 self.get_dimensions_timer.start_timer(
                     self._add_annotation_layer,
                     name)
-            s.layout = 'xy-3d'
-            s.showSlices = False
-            self.viewer.set_state(s)
 
     def _add_annotation_layer(self, name):
         """Adds an annotation layer to the viewer.
@@ -171,13 +244,17 @@ class _ViewerBase:
         Args:
             name(str) : name of the annotation layer.
         """
-        if any(self.viewer.state.dimensions):
-            s = deepcopy(self.viewer.state)
-            self.dimensions = s.dimensions
-            s.layers[''] = neuroglancer.LocalAnnotationLayer(
-                dimensions=self.dimensions,
-                linked_segmentation_layer={'segments': name})
-            self.viewer.set_state(s)
+        # guards against a second timer tick racing the stopTimer signal,
+        # which could insert the annotation layer twice
+        if self.dimensions is not None:
+            return
+        dimensions = self.viewer.state.dimensions
+        if any(dimensions):
+            self.dimensions = dimensions
+            with self.viewer.txn() as s:
+                s.layers[''] = neuroglancer.LocalAnnotationLayer(
+                    dimensions=dimensions,
+                    linked_segmentation_layer={'segments': name})
             self.get_dimensions_timer.stopTimer.set()
             self._annotation_layer_cb()
 
@@ -196,53 +273,147 @@ class _ViewerBase:
             print('no valid keybinding configuration file was specified. '
                   'Please restart and provide a valid keybinding config')
             return
-        keybindings = ConfigParser()
-        keybindings.read(ini_file)
+        bindings, binding_groups = _load_keybindings(
+            str(ini_file), os.path.getmtime(ini_file))
         with self.viewer.config_state.txn() as s:
-            for str_ in keybindings['KEYBINDINGS']:
-                key = keybindings['KEYBINDINGS'][str_]
-                binding_group = keybindings['BINDING_GROUP'][str_]
-                if binding_group == 'viewer':
-                    s.input_event_bindings.viewer[key] = str_
-                elif binding_group == 'data_view':
-                    s.input_event_bindings.data_view[key] = str_
-                elif binding_group == 'perspective_view ':
-                    s.input_event_bindings.perspective_view[key] = str_
-                elif binding_group == 'slice_view':
-                    s.input_event_bindings.slice_view[key] = str_
-                else:
+            groups = {'viewer': s.input_event_bindings.viewer,
+                      'data_view': s.input_event_bindings.data_view,
+                      'perspective_view': s.input_event_bindings.perspective_view,
+                      'slice_view': s.input_event_bindings.slice_view}
+            for str_, key in bindings.items():
+                try:
+                    group = groups[binding_groups[str_].strip()]
+                except KeyError:
                     raise ValueError('Binding group not found')
+                group[key] = str_
 
     # BROWSER
     def _run_browser(self):
-        chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_experimental_option('excludeSwitches',
-                                               ['enable-logging'])
-        self._driver = webdriver.Chrome(options=chrome_options)
-        self._driver.maximize_window()
-        self._driver.get(self.viewer.get_viewer_url())
+        # imported here so that using the helper classes of this module does
+        # not pay the selenium import cost
+        from selenium import webdriver
+
+        global _SHARED_DRIVER
+        with _shared_driver_lock:
+            if _SHARED_DRIVER is None:
+                chrome_options = webdriver.ChromeOptions()
+                chrome_options.add_experimental_option('excludeSwitches',
+                                                       ['enable-logging'])
+                chrome_options.add_argument('--no-first-run')
+                chrome_options.add_argument('--no-default-browser-check')
+                if self._headless:
+                    chrome_options.add_argument('--headless=new')
+                    chrome_options.add_argument('--disable-gpu')
+                    # required when running in containers where the default
+                    # sandbox and /dev/shm are unavailable or too small
+                    chrome_options.add_argument('--no-sandbox')
+                    chrome_options.add_argument('--disable-dev-shm-usage')
+                if self._user_data_dir is not None:
+                    chrome_options.add_argument(
+                        '--user-data-dir={}'.format(self._user_data_dir))
+                if not self._headless:
+                    # maximizing via launch argument saves the separate
+                    # maximize_window webdriver round-trip
+                    chrome_options.add_argument('--start-maximized')
+                _SHARED_DRIVER = webdriver.Chrome(options=chrome_options)
+                _SHARED_DRIVER.get(self._viewer_url)
+            else:
+                _SHARED_DRIVER.execute_script(
+                    'window.open({!r})'.format(self._viewer_url))
+                _SHARED_DRIVER.switch_to.window(
+                    _SHARED_DRIVER.window_handles[-1])
+            self._driver = _SHARED_DRIVER
+            self._tab_handle = _SHARED_DRIVER.current_window_handle
 
     # EXIT
+    def _close_browser(self):
+        """closes the viewer's browser tab and quits the shared driver with
+        the last tab"""
+        global _SHARED_DRIVER
+        with _shared_driver_lock:
+            if self._tab_handle in self._driver.window_handles:
+                self._driver.switch_to.window(self._tab_handle)
+                self._driver.close()
+            if not self._driver.window_handles:
+                self._driver.quit()
+                _SHARED_DRIVER = None
+
     def _clean_exit(self):
-        self._driver.quit()
+        # the browser teardown blocks on chromedriver while the token removal
+        # and timer stop are independent of it, so run it concurrently and
+        # join before the viewer is parked for reuse
+        browser_exit = Thread(target=self._close_browser)
+        browser_exit.start()
         if self.remove_token:
             try:
-                os.remove(os.path.expanduser('~/.apitools.token'))
-                os.remove(os.path.expanduser('~/.apitools.token.lock'))
+                os.remove(_APITOKEN)
+                os.remove(_APITOKEN_LOCK)
             except FileNotFoundError:
-                print(os.path.expanduser('~/.apitools.token'),
+                print(_APITOKEN,
                       ' was not found - apitoken could not be removed')
 
-        if hasattr(self, 'timer'):
+        if self.timer is not None:
             self.timer.stopTimer.set()
+        # the dimensions poll may still be running when the user exits before
+        # the annotation layer dimensions ever populated
+        if self.annotation_flag:
+            self.get_dimensions_timer.stopTimer.set()
+        # drop a message burst awaiting its coalesced flush so the flush
+        # thread returns without touching the parked viewer
+        with self._msg_lock:
+            self._pending_msg = None
+
+        browser_exit.join()
+        # park the viewer for reuse by the next session; actions registered
+        # under the same name are overwritten when that session binds its
+        # keys, and the state is emptied here so no layers or segments leak
+        # between sessions. The viewer attribute stays set: a callback that
+        # slips in after the stop signals then performs a harmless state
+        # write instead of dying on a nulled viewer
+        self.viewer.set_state(neuroglancer.ViewerState())
+        with _viewer_pool_lock:
+            _VIEWER_POOL.append(self.viewer)
 
     # BASIC FUNCTIONS
     def upd_msg(self, msg):
         """displays message in the neuroglancer status message bar
 
+        An isolated message is pushed immediately. Messages arriving within
+        50 ms of the last push are coalesced: the latest one of the burst is
+        flushed in a single config-state transaction once the window has
+        passed, identical repeats are dropped entirely. This keeps rapid
+        progress updates from flooding the browser with one transaction per
+        message.
+
         Args:
             msg (str) : a message
         """
+        with self._msg_lock:
+            now = monotonic()
+            if msg == self._last_msg and now - self._last_msg_ts < .05:
+                return
+            if now - self._last_msg_ts < .05:
+                self._pending_msg = msg
+                if not self._msg_flush_scheduled:
+                    self._msg_flush_scheduled = True
+                    Thread(target=self._flush_msg, daemon=True).start()
+                return
+            self._last_msg = msg
+            self._last_msg_ts = now
+        with self.viewer.config_state.txn() as s:
+            s.status_messages['status'] = msg
+
+    def _flush_msg(self):
+        """pushes the newest message of a burst after the coalescing window"""
+        sleep(.05)
+        with self._msg_lock:
+            self._msg_flush_scheduled = False
+            msg = self._pending_msg
+            self._pending_msg = None
+            if msg is None or msg == self._last_msg:
+                return
+            self._last_msg = msg
+            self._last_msg_ts = monotonic()
         with self.viewer.config_state.txn() as s:
             s.status_messages['status'] = msg
 
@@ -254,14 +425,36 @@ class _ViewerBase:
             segments (list or set) : segments to display
         """
         segments = int_to_list(segments)
+        # skip the transaction when the layer already displays exactly these
+        # segments; the comparison runs against the live state rather than a
+        # cache of the last push so selection changes made directly in the
+        # browser cannot make the check stale
+        new = {int(seg) for seg in segments}
+        displayed = {int(seg) for seg in
+                     self.viewer.state.layers[layer].segments}
+        if new == displayed:
+            return
         with self.viewer.txn() as s:
-            s.layers[layer].segments = segments
+            s.layers[layer].segments = new
 
     def upd_segment_query(self, layer, segments):
         """enters segments in segment Query Panel for respective layer"""
-        if isinstance(segments, int):
-            segments = [segments]
+        segments = int_to_list(segments)
+        with self.viewer.txn() as s:
+            s.layers[layer].segmentQuery = ', '.join(
+                [str(seg) for seg in segments])
+
+    def upd_layer_selection(self, layer, segments):
+        """displays segments in a layer and enters them in its segment Query
+        Panel in a single viewer transaction
+
+        Args:
+            layer (str) : name of the target layer
+            segments (list or set) : segments to display
+        """
+        segments = int_to_list(segments)
         with self.viewer.txn() as s:
+            s.layers[layer].segments = segments
             s.layers[layer].segmentQuery = ', '.join(
                 [str(seg) for seg in segments])
 
@@ -275,8 +468,7 @@ class _ViewerBase:
             list of segment ids selected in layer
 
         """
-        s = deepcopy(self.viewer.state)
-        objects = list(s.layers[layer].segments)
+        objects = list(self.viewer.state.layers[layer].segments)
         return objects
 
     def get_viewport_loc(self):
@@ -289,9 +481,8 @@ class _ViewerBase:
         Args:
             coord (list) : voxel coordinates [x,y,z]
         """
-        s = deepcopy(self.viewer.state)
-        s.voxel_coordinates = coord
-        self.viewer.set_state(s)
+        with self.viewer.txn() as s:
+            s.voxel_coordinates = coord
 
     def cursor_misplaced_msg(self):
         """function to display message that cursor was misplaced"""
@@ -349,16 +540,10 @@ class _ViewerBase:
         Args:
             layer (str) : name of the target layer
         """
-        state = deepcopy(self.viewer.state)
-        cur_val = state.layers[layer].selectedAlpha
-        vals = [0, .25, .5]
-        val = vals[-1]
-        if cur_val in vals:
-            idx = vals.index(cur_val)
-            idx = (idx + 1) % len(vals)
-            val = vals[idx]
-        state.layers[layer].selectedAlpha = val
-        self.viewer.set_state(state)
+        cur_val = self.viewer.state.layers[layer].selectedAlpha
+        val = self._OPACITY_CYCLE.get(cur_val, .5)
+        with self.viewer.txn() as s:
+            s.layers[layer].selectedAlpha = val
 
     def toggle_hover_value_display(self):
         """toggles the display of item values at the cursor position in the
@@ -462,12 +647,24 @@ class _ViewerBase2Col(_ViewerBase):
                              'entries of "layer": <path to data>')
         self.layer_names = ['raw'] + list(layers.keys())
         self.seg_vols = [[self.layer_names[1]], [self.layer_names[2]]]
+        # the segmentation layer pair is fixed, so the counterpart of each
+        # layer is a plain lookup instead of a return_other call per toggle
+        self._other_layer = {self.layer_names[1]: self.layer_names[2],
+                             self.layer_names[2]: self.layer_names[1]}
 
         if ini_dir == None:
-            self.ini_dir = os.path.dirname(os.path.abspath(__file__))
+            self.ini_dir = _DEFAULT_INI_DIR
         else:
             self.ini_dir = ini_dir
 
+        # layout objects are built once on first toggle and reused; see
+        # _get_layouts
+        self._cached_layouts = None
+        # the viewer starts in the plain 'xy-3d' data panel layout; the flag
+        # tracks this so _toggle_layout does not have to introspect the type
+        # of the live layout object on every keypress
+        self._in_data_panel_layout = True
+
         super().__init__(raw_data, layers, **kwargs)
 
     def _init_viewer(self, raw_data, layers={}, viewer_state=None):
@@ -498,16 +695,16 @@ class _ViewerBase2Col(_ViewerBase):
         """creates 2 column layout after an annotation layer has been added"""
         self._toggle_layout(self.layer_names[1])
 
-    def _toggle_layout(self, layer_to_show):
-        """switches between 2 column and one column layout of the viewer
+    def _get_layouts(self):
+        """returns the split and single column layout objects
+
+        The layouts are constructed once on first use and cached. By the time
+        a layout toggle can be triggered layer_names and seg_vols are final
+        (the optional annotation layer is appended before the first toggle),
+        so the cached objects stay valid for the session.
         """
-        layer_to_hide = return_other(self.layer_names[1:], layer_to_show)
-        viewer_state = deepcopy(self.viewer.state)
-        if type(
-                viewer_state.layout) == neuroglancer.viewer_state.DataPanelLayout:
-            viewer_state.layers[layer_to_show].visible = True
-            viewer_state.layers[layer_to_hide].visible = True
-            viewer_state.layout = neuroglancer.row_layout([
+        if self._cached_layouts is None:
+            split = neuroglancer.row_layout([
                 neuroglancer.LayerGroupViewer(layout='xy',
                                               layers=self.layer_names),
                 neuroglancer.LayerGroupViewer(layout='3d',
@@ -515,14 +712,26 @@ class _ViewerBase2Col(_ViewerBase):
                 neuroglancer.LayerGroupViewer(layout='3d',
                                               layers=self.seg_vols[1]),
             ])
-
-        elif type(viewer_state.layout) == neuroglancer.viewer_state.StackLayout:
-            viewer_state.layers[layer_to_hide].visible = False
-            viewer_state.layout = neuroglancer.row_layout([
+            single = neuroglancer.row_layout([
                 neuroglancer.LayerGroupViewer(layout='xy-3d',
                                               layers=self.layer_names)])
+            self._cached_layouts = (split, single)
+        return self._cached_layouts
 
-        self.viewer.set_state(viewer_state)
+    def _toggle_layout(self, layer_to_show):
+        """switches between 2 column and one column layout of the viewer
+        """
+        layer_to_hide = self._other_layer[layer_to_show]
+        split, single = self._get_layouts()
+        with self.viewer.txn() as s:
+            if self._in_data_panel_layout:
+                s.layers[layer_to_show].visible = True
+                s.layers[layer_to_hide].visible = True
+                s.layout = split
+                self._in_data_panel_layout = False
+            else:
+                s.layers[layer_to_hide].visible = False
+                s.layout = single
 
     def _set_keybindings(self):
         """Binds strings to call back functions"""
@@ -567,7 +776,7 @@ class SegmentBrowser(_ViewerBase):
         """
         # check and set directory of key bindings ini file
         if ini_dir is None:
-            self.ini_dir = os.path.dirname(os.path.abspath(__file__))
+            self.ini_dir = _DEFAULT_INI_DIR
         else:
             self.ini_dir = ini_dir
 
@@ -580,6 +789,12 @@ class SegmentBrowser(_ViewerBase):
         self.lst_max = 0
         self.items = items
         self.update_lst_max()
+        # the item lists are fixed for a browsing session, so the segment
+        # query strings are serialized once instead of on every navigation
+        self._query_strings = {
+            layer: [', '.join(str(seg) for seg in int_to_list(item))
+                    for item in item_list]
+            for layer, item_list in items.items()}
 
         self.coords = coord_lst
         if self.coords:
@@ -627,17 +842,23 @@ class SegmentBrowser(_ViewerBase):
         self.display_current()
 
     def display_current(self):
-        """triggers display of current neuron and neuron group in the viewer"""
-        for layer in self.items.keys():
-            if len(self.items[layer]) <= self.current_idx:
-                segments = []
-            else:
-                segments = self.items[layer][self.current_idx]
-            self.upd_viewer_segments(layer, segments)
-            self.upd_segment_query(layer, segments)
+        """triggers display of current neuron and neuron group in the viewer
 
-        if self.coords:
-            self.set_viewer_loc(self.coords[self.current_idx])
+        All layers are updated in a single viewer transaction so that one
+        navigation keypress pushes one state diff instead of two per layer.
+        """
+        with self.viewer.txn() as s:
+            for layer, item_list in self.items.items():
+                if len(item_list) <= self.current_idx:
+                    segments = []
+                    query = ''
+                else:
+                    segments = int_to_list(item_list[self.current_idx])
+                    query = self._query_strings[layer][self.current_idx]
+                s.layers[layer].segments = segments
+                s.layers[layer].segmentQuery = query
+            if self.coords:
+                s.voxel_coordinates = self.coords[self.current_idx]
 
         self.display_info()
 
@@ -651,7 +872,8 @@ class SegmentBrowser(_ViewerBase):
 
     def update_lst_max(self):
         """update maximal entry in lists in item list"""
-        self.lst_max = max([len(int_to_list(v)) for v in self.items.values()])
+        self.lst_max = max((len(int_to_list(v)) for v in self.items.values()),
+                           default=0)
 
     def exit(self):
         """exits program"""
@@ -662,6 +884,8 @@ class Annotations:
     """Class that adds functionality to add annotations in neuroglancer
     """
 
+    __slots__ = ('anno_id', 'viewer')
+
     def __init__(self, anno_id=0, viewer=None):
         """initiates Annotations class
 
@@ -703,6 +927,18 @@ class Annotations:
             annotations = s.layers[layer].annotations
             annotations.append(anno)
 
+    def mk_annotations(self, layer, annos):
+        """appends several annotations in a single viewer transaction
+
+        Args:
+            layer (str) : name of the target layer
+            annos (list) : neuroglancer annotations
+        """
+        with self.viewer.txn() as s:
+            annotations = s.layers[layer].annotations
+            for anno in annos:
+                annotations.append(anno)
+
     def make_ellipsoid(self, layer, location, radii=[25, 25, 10], id_=None):
         """Sets an ellipsoid annotation
 
@@ -717,6 +953,21 @@ class Annotations:
                                                 radii=radii)
         self.mk_annotation(layer, anno)
 
+    def make_ellipsoids(self, layer, locations, radii=[25, 25, 10]):
+        """Sets several ellipsoid annotations in a single viewer transaction
+
+        Args:
+            layer (str) : name of the target layer
+            locations (list) : list of ellipsoid centers in voxel coordinates
+                               [[x,y,z], ...]
+            radii (list) :  ellipsoid radii [x,y,z] (optional)
+        """
+        annos = [neuroglancer.EllipsoidAnnotation(id=self.mk_anno_id(None),
+                                                  center=location,
+                                                  radii=radii)
+                 for location in locations]
+        self.mk_annotations(layer, annos)
+
     def make_point_annotation(self, layer, location, id_=None):
         """Sets a point annotation
 
@@ -729,6 +980,18 @@ class Annotations:
                                             point=location)
         self.mk_annotation(layer, anno)
 
+    def make_point_annotations(self, layer, locations):
+        """Sets several point annotations in a single viewer transaction
+
+        Args:
+            layer (str) : name of the target layer
+            locations (list) : list of voxel coordinates [[x,y,z], ...]
+        """
+        annos = [neuroglancer.PointAnnotation(id=self.mk_anno_id(None),
+                                              point=location)
+                 for location in locations]
+        self.mk_annotations(layer, annos)
+
     def make_line(self, layer, pointa, pointb, id_=None):
         """makes a line annotation
 
@@ -742,6 +1005,19 @@ class Annotations:
                                            point_a=pointa, point_b=pointb)
         self.mk_annotation(layer, anno)
 
+    def make_lines(self, layer, point_pairs):
+        """Sets several line annotations in a single viewer transaction
+
+        Args:
+            layer (str) : name of the target layer
+            point_pairs (list) : list of voxel coordinate pairs
+                                 [[[x,y,z], [x,y,z]], ...]
+        """
+        annos = [neuroglancer.LineAnnotation(id=self.mk_anno_id(None),
+                                             point_a=pointa, point_b=pointb)
+                 for pointa, pointb in point_pairs]
+        self.mk_annotations(layer, annos)
+
     def mk_box_annotation(self, layer, pointa, pointb, id_=None):
         """create a bounding box or cuboid annotation
 
@@ -758,16 +1034,74 @@ class Annotations:
                                                                  id_))
         self.mk_annotation(layer, anno)
 
+    def mk_box_annotations(self, layer, point_pairs):
+        """Sets several bounding box annotations in a single viewer transaction
+
+        Args:
+            layer (str) : name of the target layer
+            point_pairs (list) : list of box origin and maximal extend
+                                 coordinate pairs [[[x,y,z], [x,y,z]], ...]
+        """
+        annos = [neuroglancer.AxisAlignedBoundingBoxAnnotation(
+            pointA=pointa, pointB=pointb, id=self.mk_anno_id(None))
+            for pointa, pointb in point_pairs]
+        self.mk_annotations(layer, annos)
+
+
+# all Timer instances share a single dispatcher thread: pending timers live
+# in a heap of (deadline, tie-break, timer, args, kwargs) entries and the
+# dispatcher sleeps until the nearest deadline, so N timers cost one thread
+# and one wakeup per firing instead of a parked thread each
+_timer_entries = []
+_timer_cond = Condition()
+_timer_seq = count()
+_timer_thread = None
+
+
+def _timer_dispatch():
+    """runs timer callbacks at their deadlines and reschedules them
+
+    Callbacks execute serially on this thread; a stopped timer's pending
+    entry is discarded when its deadline comes up. A raising callback is
+    reported and rescheduled - the dispatcher is shared by every timer in
+    the process and must survive any single callback failure.
+    """
+    while True:
+        with _timer_cond:
+            while not _timer_entries:
+                _timer_cond.wait()
+            remaining = _timer_entries[0][0] - monotonic()
+            if remaining > 0:
+                _timer_cond.wait(remaining)
+                continue
+            _, _, timer, args, kwargs = heapq.heappop(_timer_entries)
+        if timer.stopTimer.is_set():
+            continue
+        try:
+            timer._func(*args, **kwargs)
+        except Exception as e:
+            print('timer callback', timer._func, 'raised:', repr(e))
+        with _timer_cond:
+            if not timer.stopTimer.is_set():
+                heapq.heappush(_timer_entries,
+                               (monotonic() + timer.interval,
+                                next(_timer_seq), timer, args, kwargs))
+
 
 class Timer:
     """Timer that executes function at defined time intervals
 
+    The callback runs on the dispatcher thread shared by all timers, so a
+    long-running callback delays other timers until it returns.
+
     Attributes:
         stopTimer (threading.Event)
         interval (int) : interval between function execution
         _func = function to execute
     """
 
+    __slots__ = ('stopTimer', 'interval', '_func')
+
     def __init__(self, interval):
         """
 
@@ -779,12 +1113,13 @@ class Timer:
         self._func = None
 
     def start_timer(self, func, *args, **kwargs):
+        global _timer_thread
         self._func = func
-        Thread(target=self._timer_fcn, args=args, kwargs=kwargs,
-               daemon=True).start()
-
-    def _timer_fcn(self, *args, **kwargs):
-        """timer function to trigger function at interval sec
-        """
-        while not self.stopTimer.wait(self.interval):
-            self._func(*args, **kwargs)
+        with _timer_cond:
+            heapq.heappush(_timer_entries,
+                           (monotonic() + self.interval, next(_timer_seq),
+                            self, args, kwargs))
+            if _timer_thread is None:
+                _timer_thread = Thread(target=_timer_dispatch, daemon=True)
+                _timer_thread.start()
+            _timer_cond.notify()
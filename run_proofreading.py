@@ -1,15 +1,23 @@
 import argparse
 import json
+import mmap
 import os
 import re
 
-from brainmaps_api_fcn.equivalence_requests import EquivalenceRequests
-from graph_from_bigquery.graph_from_bigquery import BigQueryAgglomerationGraph
-from agglomeration_proofreading.neuron_proofreader import NeuronProofreading
-from agglomeration_proofreading.API_interface import GraphTools
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from agglomeration_proofreading.config_fcn import determine_args
 from agglomeration_proofreading.ap_utils import keys_to_int
 
+# matches the timestamped review snapshots written on saving; compiled once at
+# import and anchored so delta logs and unrelated files are rejected without
+# scanning past the extension
+_REVIEW_FILE_RE = re.compile(r'\d{6}_\d{6}_agglomerationReview\.json$')
+
+
 # Todo wrap around Gooey, make this optional when run from command line
 def run_proofreading(args):
     """Sets arguments from parser and starts proofreading tool
@@ -17,53 +25,88 @@ def run_proofreading(args):
     Args:
         args (argparse.ArgumentParser.parse_args())
     """
-    pattern = re.compile(r'\d{6}_\d{6}\_agglomerationReview.json')
+    # deferred so that argument parsing and --help do not pay for the
+    # neuroglancer/selenium import chain
+    from brainmaps_api_fcn.equivalence_requests import EquivalenceRequests
+    from agglomeration_proofreading.neuron_proofreader import NeuronProofreading
+    from agglomeration_proofreading.API_interface import GraphTools
+
     try:
-        latest_file = max(filter(pattern.search, os.listdir(args.dir_path)))
+        # single pass over the directory entries without materializing the
+        # full listing
+        with os.scandir(args.dir_path) as entries:
+            latest_file = max((entry.name for entry in entries
+                               if _REVIEW_FILE_RE.search(entry.name)),
+                              default=None)
+    except FileNotFoundError:
+        print("The path for data storage is not found. Please enter a valid "
+              "path in the proofreading.ini. Alternatively, the path can be set"
+              " by calling the proofreading tool with the flag -dir_path "
+              "<path_to_directory>")
+        return
+
+    if latest_file is None:
+        review_data = None
+    else:
         full_fn = os.path.join(args.dir_path, latest_file)
+        loads = json.loads if orjson is None else orjson.loads
         with open(full_fn, 'rb') as f:
-            review_data = json.load(f)
+            if orjson is None:
+                # stdlib json only takes str/bytes, so the file is read whole
+                review_data = json.loads(f.read())
+            else:
+                # orjson parses any buffer, so the snapshot is mapped and
+                # demand-paged instead of copied into an intermediate bytes
+                # object
+                with mmap.mmap(f.fileno(), 0,
+                               access=mmap.ACCESS_READ) as mm:
+                    review_data = orjson.loads(memoryview(mm))
+        # replay delta log with the items appended since the last full snapshot
+        delta_fn = full_fn.replace('.json', '_delta.jsonl')
+        if os.path.exists(delta_fn):
+            with open(delta_fn, 'r') as f:
+                for line in f:
+                    record = loads(line)
+                    if record['name'] == 'last_position':
+                        review_data['last_position'] = record['value']
+                    else:
+                        review_data[record['name']] += record['added']
         review_data['neuron_graph'] = keys_to_int(review_data[
                                                       'neuron_graph'])
+        # each history entry is a single-item dict; unpacking items() fetches
+        # key and value in one traversal, and the bound method lookup is
+        # hoisted out of a loop that can hold thousands of entries
+        kti = keys_to_int
         for dct in review_data['action_history']:
-            key = next(iter(dct.keys()))
-            val = dct[key]
+            (key, val), = dct.items()
             if key == 'split':
-                dct[key] = [val[0], keys_to_int(val[1])]
+                dct[key] = [val[0], kti(val[1])]
+            elif isinstance(val, dict):
+                dct[key] = kti(val)
             else:
-                if isinstance(val, dict):
-                    dct[key] = keys_to_int(val)
-                else:
-                    print('The data in ', full_fn, 'has unexpected format '
-                          'and could not be loaded')
+                print('The data in ', full_fn, 'has unexpected format '
+                      'and could not be loaded')
 
-    except ValueError:  # thrown by max if no file with pattern found
-        review_data = None
+    # probe by opening instead of os.path.exists: one syscall and no window
+    # between the check and the use by EquivalenceRequests
+    try:
+        open(args.service_account, 'rb').close()
     except FileNotFoundError:
-        print("The path for data storage is not found. Please enter a valid "
-              "path in the proofreading.ini. Alternatively, the path can be set"
-              " by calling the proofreading tool with the flag -dir_path "
-              "<path_to_directory>")
-        return
-
-    if not os.path.exists(args.service_account):
         print('Please enter valid path to service account file via the command '
               'line or to the proofreading.ini')
-        raise FileNotFoundError
+        raise
 
     brainmaps_api_fcn = EquivalenceRequests(volume_id=args.base_volume,
                                             change_stack_id=args.change_stack_id,
                                             service_account_secrets=args.service_account)
 
     graph_tool = GraphTools(api_fcn=brainmaps_api_fcn)
-    base_path = args.data_src + args.base_volume
-    raw_path = args.data_src + args.raw_data
 
     with NeuronProofreading(dir_path=args.dir_path,
                             data=review_data,
                             graph_tool=graph_tool,
-                            base_vol=base_path,
-                            raw_data=raw_path,
+                            base_vol=args.base_path,
+                            raw_data=args.raw_path,
                             timer_interval=args.save_int,
                             remove_token=args.remove_token) as aobr:
         aobr.exit_event.wait()
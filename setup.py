@@ -14,9 +14,15 @@ setuptools.setup(
     packages=setuptools.find_packages(),
     description=description,
     long_description=open('README.md').read(),
+    python_requires='>=3.8',
     install_requires=[
         'selenium',
-        'neuroglancer'
+        'neuroglancer',
+        'numpy'
     ],
-    extras_require={'brainmaps_api_fcn': ['brainmaps_api_fcn @ git+https://github.com/moenigin/brainmaps_api_fcn.git@master']}
+    extras_require={
+        'brainmaps_api_fcn': ['brainmaps_api_fcn @ git+https://github.com/moenigin/brainmaps_api_fcn.git@master'],
+        # optional C-accelerated JSON backend used by the save/load paths
+        'fast-json': ['orjson>=3.9'],
+    }
 )